@@ -0,0 +1,347 @@
+import os
+import sys
+import struct
+import datetime
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+from array import array
+
+CACHE_MAGIC = b"MAMELYC1"
+CACHE_FILE = "MAMEly.cache"
+
+LISTING_MAGIC = "MAMELYD1"
+LISTING_FILE = "romdir.cache"
+
+# Files whose contents decide what ends up in the compiled catalog
+CACHE_DEPENDENCIES = ["MAMEly.xml", "_skipGenre.txt", "_skipRating.txt", "_flags.txt", "catver.ini"]
+
+FLAG_FAVORITE = 1
+FLAG_IGNORE = 2
+
+READ_CHUNK_SIZE = 64 * 1024
+
+def file_signature(path):
+    """Return (mtime_ns, size) for a file, or (0, 0) if it does not exist."""
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (0, 0)
+
+def read_binary(path):
+    """Return the bytes of a binary cache file, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def write_binary(path, chunks, label):
+    """Write byte chunks to path through a temporary file, so a reader never sees
+    a partial cache. Returns True on success."""
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Error writing {label}: {e}")
+        return False
+
+def pack_strings(strings, errors="strict"):
+    """Encode strings as string count, blob length (uint32 each) and a NUL separated UTF-8 blob."""
+    blob = "\0".join(strings).encode("utf-8", errors)
+    return struct.pack("<II", len(strings), len(blob)) + blob
+
+def pack_array(values):
+    """Bytes of an array in little endian order."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+class BinaryReader:
+    """Reads back what pack_strings/pack_array wrote, in order.
+
+    Every read past the end raises ValueError; callers treat that, struct.error and
+    UnicodeDecodeError as a stale cache.
+    """
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def take(self, size):
+        chunk = self.data[self.pos:self.pos + size]
+        if len(chunk) != size:
+            raise ValueError("truncated cache")
+        self.pos += size
+        return chunk
+
+    def match(self, prefix):
+        """True if the next bytes are prefix (a magic or a digest)."""
+        return self.take(len(prefix)) == prefix
+
+    def unpack(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return values
+
+    def uint32(self):
+        return self.unpack("<I")[0]
+
+    def strings(self, errors="strict"):
+        count, blob_len = self.unpack("<II")
+        strings = self.take(blob_len).decode("utf-8", errors).split("\0") if count else []
+        if len(strings) != count:
+            raise ValueError("string count mismatch")
+        return strings
+
+    def array(self, typecode, count=None):
+        """Read count items (default: the rest of the data) into an array."""
+        values = array(typecode)
+        if count is None:
+            chunk = self.data[self.pos:]
+            self.pos = len(self.data)
+        else:
+            chunk = self.take(count * values.itemsize)
+        values.frombytes(chunk)
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+def iter_games(xml_path, callback_progress=None):
+    """Stream (name, {child tag: text}) for every <game> in a MAMEly.xml.
+
+    Elements are dropped as soon as each game closes so memory stays bounded by one
+    record, and callback_progress gets the percentage of bytes read from the file.
+    Raises ET.ParseError on malformed XML.
+    """
+    total_bytes = os.path.getsize(xml_path) or 1
+    read_bytes = 0
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+
+    with open(xml_path, "rb") as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if chunk:
+                parser.feed(chunk)
+            else:
+                parser.close()
+
+            for event, elem in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        root = elem
+                elif elem.tag == "game":
+                    fields = {}
+                    for child in elem:
+                        fields[child.tag] = child.text
+                    yield elem.attrib.get("name"), fields
+                    # Release the finished record (and anything else parsed so far)
+                    root.clear()
+
+            if not chunk:
+                break
+            read_bytes += len(chunk)
+            if callback_progress:
+                callback_progress(read_bytes / total_bytes * 100)
+
+def catalog_has_games(xml_path):
+    """True if xml_path holds at least one <game>, or cannot be read well enough to tell."""
+    if not os.path.exists(xml_path):
+        return False
+    try:
+        for game in iter_games(xml_path):
+            return True
+    except ET.ParseError:
+        return True
+    return False
+
+def format_game(name, fields):
+    """Render one <game> record; fields is a list of (tag, text) and None texts are left out."""
+    lines = [f"  <game name={quoteattr(name)}>\n"]
+    for tag, text in fields:
+        if text is not None:
+            lines.append(f"     <{tag}>{escape(str(text))}</{tag}>\n")
+    lines.append("  </game>\n")
+    return "".join(lines)
+
+def merge_catalog(xml_path, games, generator_version):
+    """Rewrite a MAMEly.xml from freshly generated games, carrying favorite/ignore forward by ROM name.
+
+    games yields (name, description, genre, rating); genre/rating may be None for
+    platforms without them. The existing file is streamed into a name -> fields map,
+    the new games are streamed out against it, and the file is only replaced when
+    something was added, removed or changed (the previous copy is kept as .old).
+    Returns (added, removed, changed), or None when no games came in and the
+    existing catalog has some (it is left untouched).
+    """
+    existing = {}
+    if os.path.exists(xml_path):
+        for name, fields in iter_games(xml_path):
+            existing[name] = fields
+
+    added = changed = written = 0
+    tmp_path = xml_path + ".tmp"
+    with open(tmp_path, "w", buffering=1024 * 1024) as f:
+        f.write("<?xml version=\"1.0\"?>\n")
+        f.write("<menu>\n")
+        f.write("  <header>\n")
+        f.write("    <listname>MAMEly</listname>\n")
+        f.write(f"    <lastlistupdate>{datetime.datetime.now()}</lastlistupdate>\n")
+        f.write(f"    <listgeneratorversion>{generator_version}</listgeneratorversion>\n")
+        f.write("  </header>\n")
+
+        for name, description, genre, rating in games:
+            previous = existing.pop(name, None)
+            favorite = ignore = "0"
+            if previous is None:
+                added += 1
+            else:
+                favorite = previous.get("favorite") or "0"
+                ignore = previous.get("ignore") or "0"
+                # Empty and missing tags read back as None; case is ignored because
+                # RomManager title-cases descriptions and genres when it saves
+                before = tuple((previous.get(tag) or "").casefold() for tag in ("description", "genre", "rating"))
+                if before != tuple((value or "").casefold() for value in (description, genre, rating)):
+                    changed += 1
+            f.write(format_game(name, [("description", description), ("genre", genre), ("rating", rating),
+                                       ("favorite", favorite), ("ignore", ignore)]))
+            written += 1
+
+        f.write("</menu>\n")
+
+    removed = len(existing)
+    if not written and removed:
+        print(f"No games generated, keeping the {removed} games in {xml_path}")
+        os.remove(tmp_path)
+        return None
+    if added or removed or changed:
+        if os.path.exists(xml_path):
+            os.replace(xml_path, xml_path + ".old")
+        os.replace(tmp_path, xml_path)
+    else:
+        os.remove(tmp_path)
+    return added, removed, changed
+
+class CatalogCache:
+    """Compiled binary copy of a platform's filtered MAMEly.xml.
+
+    Layout (little endian):
+        magic | signature (2 x int64 per dependency) | string count, blob length |
+        NUL separated UTF-8 string blob | rom count |
+        uint32 string indexes (name, description, genre, rating) per rom |
+        one flag byte per rom
+    """
+    def __init__(self, platform_path):
+        self.platform_path = platform_path
+        self.cache_path = os.path.join(platform_path, CACHE_FILE)
+
+    def signature(self):
+        sig = []
+        for name in CACHE_DEPENDENCIES:
+            sig.extend(file_signature(os.path.join(self.platform_path, name)))
+        return tuple(sig)
+
+    def load(self):
+        """Return a list of (name, description, genre, rating, favorite, ignore) or None if stale."""
+        data = read_binary(self.cache_path)
+        if data is None:
+            return None
+
+        try:
+            reader = BinaryReader(data)
+            if not reader.match(CACHE_MAGIC):
+                return None
+            if reader.unpack("<%dq" % (2 * len(CACHE_DEPENDENCIES))) != self.signature():
+                return None
+            strings = reader.strings()
+            n_roms = reader.uint32()
+            idx = reader.array("I", n_roms * 4)
+            flags = reader.take(n_roms)
+        except (struct.error, UnicodeDecodeError, ValueError):
+            return None
+
+        records = []
+        for i in range(n_roms):
+            j = i * 4
+            fl = flags[i]
+            records.append((strings[idx[j]], strings[idx[j + 1]], strings[idx[j + 2]], strings[idx[j + 3]],
+                            1 if fl & FLAG_FAVORITE else 0, 1 if fl & FLAG_IGNORE else 0))
+        return records
+
+    def save(self, records):
+        """Write the cache for (name, description, genre, rating, favorite, ignore) records,
+        stamped with the current signature."""
+        strings = []
+        lookup = {}
+        idx = array("I")
+        flags = bytearray()
+
+        for name, description, genre, rating, favorite, ignore in records:
+            for s in (name, description, genre, rating):
+                s = s or ""
+                i = lookup.get(s)
+                if i is None:
+                    i = lookup[s] = len(strings)
+                    strings.append(s)
+                idx.append(i)
+            flags.append((FLAG_FAVORITE if favorite else 0) | (FLAG_IGNORE if ignore else 0))
+
+        sig_fmt = "<%dq" % (2 * len(CACHE_DEPENDENCIES))
+        write_binary(self.cache_path, [CACHE_MAGIC, struct.pack(sig_fmt, *self.signature()),
+                                       pack_strings(strings), struct.pack("<I", len(flags)),
+                                       pack_array(idx), bytes(flags)], "catalog cache")
+
+class DirectoryListingCache:
+    """Names of the files in a platform's ROM directory, reused until the directory's mtime changes.
+
+    Stored as text: a "magic<TAB>directory<TAB>mtime_ns" header line, then one file name per line.
+    """
+    def __init__(self, platform_path, rom_directory):
+        self.rom_directory = rom_directory
+        self.cache_path = os.path.join(platform_path, LISTING_FILE)
+
+    def list_files(self):
+        """Return the list of file names in the ROM directory, scanning only if it changed."""
+        try:
+            mtime = os.stat(self.rom_directory).st_mtime_ns
+        except OSError:
+            return []
+
+        names = self.load(mtime)
+        if names is None:
+            names = []
+            with os.scandir(self.rom_directory) as it:
+                for entry in it:
+                    # entry.is_file() uses cached stat info from the directory listing if available
+                    if entry.is_file():
+                        names.append(entry.name)
+            # mtime was taken before the scan, so a change made during it forces a rescan next time
+            self.save(mtime, names)
+        return names
+
+    def load(self, mtime):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                header = f.readline().rstrip("\n").split("\t")
+                if header != [LISTING_MAGIC, self.rom_directory, str(mtime)]:
+                    return None
+                return f.read().splitlines()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def save(self, mtime, names):
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(f"{LISTING_MAGIC}\t{self.rom_directory}\t{mtime}\n")
+                if names:
+                    f.write("\n".join(names))
+                    f.write("\n")
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Error writing ROM directory cache: {e}")
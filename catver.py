@@ -0,0 +1,134 @@
+import os
+import struct
+import hashlib
+from array import array
+from catalog import read_binary, write_binary, pack_strings, pack_array, BinaryReader
+
+INDEX_MAGIC = b"MAMELYV1"
+
+MATURE_TAG = "* Mature *"
+
+class CatverIndex:
+    """Lookups into a MAME catver.ini: [Category] as (genre, subgenre, mature) and [VerAdded].
+
+    The parsed file is compiled to <name>.idx next to the ini, keyed on the SHA-1 of the
+    ini, so only the first load after a catver update pays for parsing the text.
+    Index layout (little endian): magic | sha1 | string count, blob length |
+    NUL separated UTF-8 string blob | entry count | uint32 (name, genre, subgenre, version)
+    string indexes per entry | one mature byte per entry
+    """
+    def __init__(self, ini_path):
+        self.ini_path = ini_path
+        self.index_path = os.path.splitext(ini_path)[0] + ".idx"
+        self.rows = {}  # name -> row number
+        self.strings = []
+        self.columns = array("I")
+        self.mature = b""
+        self.load()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, name):
+        return name in self.rows
+
+    def get(self, name, default=None):
+        """Return (genre, subgenre, mature) for a ROM name."""
+        row = self.rows.get(name)
+        if row is None:
+            return default
+        j = row * 4
+        strings = self.strings
+        return (strings[self.columns[j + 1]], strings[self.columns[j + 2]], self.mature[row] == 1)
+
+    def version_added(self, name):
+        row = self.rows.get(name)
+        if row is None:
+            return ""
+        return self.strings[self.columns[row * 4 + 3]]
+
+    def load(self):
+        try:
+            with open(self.ini_path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            print(f"Cannot read {self.ini_path}: {e}")
+            return
+
+        digest = hashlib.sha1(data).digest()
+        if not self.load_index(digest):
+            self.parse(data.decode("utf-8", errors="replace"))
+            self.save_index(digest)
+
+    def parse(self, text):
+        categories = {}
+        versions = {}
+        section = None
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith(";"):
+                continue
+            if line.startswith("["):
+                section = line
+                continue
+            if "=" not in line:
+                continue
+            name, value = line.split("=", 1)
+            if section == "[Category]":
+                mature = MATURE_TAG in value
+                value = value.replace(MATURE_TAG, "").strip()
+                genre, _, subgenre = value.partition(" / ")
+                # First entry wins, matching the generators' historical lookup
+                if name not in categories:
+                    categories[name] = (genre.strip(), subgenre.strip(), mature)
+            elif section == "[VerAdded]":
+                versions.setdefault(name, value.strip())
+
+        strings = []
+        lookup = {}
+        def code(s):
+            i = lookup.get(s)
+            if i is None:
+                i = lookup[s] = len(strings)
+                strings.append(s)
+            return i
+
+        columns = array("I")
+        mature = bytearray()
+        rows = {}
+        for name, (genre, subgenre, is_mature) in categories.items():
+            rows[name] = len(mature)
+            columns.extend((code(name), code(genre), code(subgenre), code(versions.get(name, ""))))
+            mature.append(1 if is_mature else 0)
+
+        self.rows = rows
+        self.strings = strings
+        self.columns = columns
+        self.mature = bytes(mature)
+
+    def load_index(self, digest):
+        data = read_binary(self.index_path)
+        if data is None:
+            return False
+
+        try:
+            reader = BinaryReader(data)
+            if not reader.match(INDEX_MAGIC) or not reader.match(digest):
+                return False
+            strings = reader.strings()
+            n_rows = reader.uint32()
+            columns = reader.array("I", n_rows * 4)
+            mature = reader.take(n_rows)
+        except (struct.error, UnicodeDecodeError, ValueError):
+            return False
+
+        self.strings = strings
+        self.columns = columns
+        self.mature = mature
+        self.rows = dict(zip((strings[i] for i in columns[0::4]), range(n_rows)))
+        return True
+
+    def save_index(self, digest):
+        write_binary(self.index_path, [INDEX_MAGIC, digest, pack_strings(self.strings),
+                                       struct.pack("<I", len(self.mature)), pack_array(self.columns),
+                                       self.mature], "catver index")
@@ -30,6 +30,7 @@ class Config:
         self.screen_width = 800
         self.screen_height = 600
         self.platforms = []
+        self.preload_platforms = False
         self.load_main_config()
 
     def load_main_config(self):
@@ -48,6 +49,10 @@ class Config:
                     self.screen_width = int(child.attrib.get("screenX", 800))
                     self.screen_height = int(child.attrib.get("screenY", 600))
                 
+                if child.tag == "preload":
+                    # <preload platforms="True"/> parses every platform at startup
+                    self.preload_platforms = (child.attrib.get("platforms") == "True")
+                
                 if child.tag == "platform":
                     name = child.attrib.get('name')
                     folder = ""
@@ -84,6 +89,11 @@ class PlatformConfig:
         self.favorites_directory = ""
         self.show_xml_progress_bar = False
         self.compare_xml_to_roms = False
+        self.catalog_backend = "xml"
+        self.watch_rom_directory = ""  # "", "auto" (inotify, else polling) or "poll"
+        self.dat_file = ""  # Logiqx XML DAT used by the generator to name cartridge ROMs
+        self.verify_roms = ""  # "", "genre" (broken sets under "Not Working") or "hide"
+        self.catalog_generator = ""  # "listxml" (mame -listxml + catver.ini), "files" (ROM file names) or "" to detect
         
         self.load_config()
 
@@ -132,12 +142,30 @@ class PlatformConfig:
                             self.show_xml_progress_bar = (val == "True")
                         elif var == "compareXMLtoRoms":
                             self.compare_xml_to_roms = (val == "True")
+                        elif var == "watchRomDirectory":
+                            if val == "True":
+                                self.watch_rom_directory = "auto"
+                            elif val.lower() == "poll":
+                                self.watch_rom_directory = "poll"
+                        elif var == "catalogBackend":
+                            self.catalog_backend = val.lower()
+                        elif var == "datFile":
+                            self.dat_file = val
+                        elif var == "catalogGenerator":
+                            self.catalog_generator = val.lower()
+                        elif var == "verifyRoms":
+                            if val == "True" or val.lower() == "genre":
+                                self.verify_roms = "genre"
+                            elif val.lower() == "hide":
+                                self.verify_roms = "hide"
                             
             # Path normalization
             if self.rom_snap_directory and not self.rom_snap_directory.startswith("/"):
                 self.rom_snap_directory = os.path.join(self.emulator_base_path, self.rom_snap_directory)
             if self.rom_directory and not self.rom_directory.startswith("/"):
                 self.rom_directory = os.path.join(self.emulator_base_path, self.rom_directory)
+            if self.dat_file and not self.dat_file.startswith("/"):
+                self.dat_file = os.path.join(self.platform_path, self.dat_file)
                             
         except Exception as e:
             print(f"Error reading platform config: {e}")
@@ -168,7 +196,7 @@ class SkinConfig:
                         # Store everything in a dict for flexibility
                         if "Color" in var:
                             self.config[var] = hex_to_color(val)
-                        elif any(x in var for x in ["X1", "Y1", "X2", "Y2", "Size", "Len", "Offset", "Time", "Spacing"]):
+                        elif any(x in var for x in ["X1", "Y1", "X2", "Y2", "Size", "Len", "Offset", "Time", "Spacing", "Width"]):
                              try:
                                  self.config[var] = int(val)
                              except ValueError:
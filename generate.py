@@ -0,0 +1,187 @@
+import os
+import sys
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from config import Config, PlatformConfig
+from catalog import format_game, merge_catalog, catalog_has_games
+from listxml import generate_listxml
+from romscan import scan_crcs, read_dat, match_dat
+
+GENERATOR_VERSION = "makeMAMEly-xml v1.0"
+
+def list_rom_files(platform_config):
+    """Return the sorted ROM file names for a platform.
+
+    Reads romDirectory directly; romlist.txt in the platform folder is only used
+    when the ROM directory is not reachable (e.g. generating on another machine).
+    """
+    extension = platform_config.rom_extension
+    try:
+        with os.scandir(platform_config.rom_directory) as it:
+            return sorted(entry.name for entry in it
+                          if entry.name.endswith(extension) and entry.is_file())
+    except OSError as e:
+        print(f"Cannot read ROM directory {platform_config.rom_directory}: {e}")
+
+    romlist_path = os.path.join(platform_config.platform_path, "romlist.txt")
+    try:
+        with open(romlist_path, "r") as f:
+            names = [line.strip() for line in f]
+    except OSError:
+        print(f"No romlist.txt in {platform_config.platform_path} either")
+        return None
+    print(f"Using {romlist_path}")
+    return [name for name in names if name.endswith(extension)]
+
+def identify_roms(platform_config, files):
+    """Look the ROM files up by CRC32 in the platform's datFile.
+
+    Returns {file name: (description, genre)} for the files the DAT knows.
+    """
+    if not platform_config.dat_file or not os.path.isdir(platform_config.rom_directory):
+        return {}
+    dat = read_dat(platform_config.dat_file)
+    if not dat:
+        return {}
+
+    crcs = scan_crcs(platform_config.rom_directory, files)
+    identified = {}
+    for name, file_crcs in crcs.items():
+        match = match_dat(file_crcs, dat)
+        if match is not None:
+            identified[name] = match
+    print(f"{len(identified)} of {len(files)} ROMs identified from {platform_config.dat_file}")
+    return identified
+
+def generate_platform(platform_path, platform_config, merge=False, jobs=None):
+    """Build MAMEly.xml for one platform. Returns True on success.
+
+    catalogGenerator picks the pipeline; when it is not set, a platform with
+    mame-listxml.xml uses listxml, and one with only catver.ini is refused rather
+    than guessed to be a cartridge platform.
+    """
+    generator = platform_config.catalog_generator
+    if not generator:
+        if os.path.exists(os.path.join(platform_path, "mame-listxml.xml")):
+            generator = "listxml"
+        elif os.path.exists(os.path.join(platform_path, "catver.ini")):
+            print(f"{platform_path} has catver.ini but no mame-listxml.xml "
+                  f"(run mame -listxml > mame-listxml.xml there, or set catalogGenerator)")
+            return False
+        else:
+            generator = "files"
+
+    if generator == "listxml":
+        return generate_listxml(platform_path, merge=merge, jobs=jobs)
+    if generator != "files":
+        print(f"Unknown catalogGenerator: {generator}")
+        return False
+
+    files = list_rom_files(platform_config)
+    if files is None:
+        return False
+
+    identified = identify_roms(platform_config, files)
+
+    extension = platform_config.rom_extension
+    games = []
+    for name in files:
+        description = name[:-len(extension)].replace("&", "and").replace("*", "-")
+        genre = "No Genre"
+        match = identified.get(name)
+        if match is not None:
+            description = match[0] or description
+            genre = match[1] or genre
+        games.append((name, description, genre, "Rating: General"))
+
+    xml_path = os.path.join(platform_path, "MAMEly.xml")
+    if not games and catalog_has_games(xml_path):
+        print(f"No ROM files found, keeping the existing {xml_path}")
+        return False
+
+    if merge:
+        merged = merge_catalog(xml_path, games, GENERATOR_VERSION)
+        if merged is None:
+            return False
+        added, removed, changed = merged
+        print(f"{xml_path} merged: {added} added, {removed} removed, {changed} changed")
+        return True
+
+    tmp_path = xml_path + ".tmp"
+    try:
+        with open(tmp_path, "w", buffering=1024 * 1024) as f:
+            f.write("<?xml version=\"1.0\"?>\n")
+            f.write("<menu>\n")
+            f.write("  <header>\n")
+            f.write("    <listname>MAMEly</listname>\n")
+            f.write(f"    <lastlistupdate>{datetime.datetime.now()}</lastlistupdate>\n")
+            f.write(f"    <listgeneratorversion>{GENERATOR_VERSION}</listgeneratorversion>\n")
+            f.write("  </header>\n")
+            for name, description, genre, rating in games:
+                f.write(format_game(name, [("description", description), ("genre", genre), ("rating", rating)]))
+            f.write("</menu>\n")
+        os.replace(tmp_path, xml_path)
+    except OSError as e:
+        print(f"Error writing {xml_path}: {e}")
+        return False
+
+    print(f"{len(games)} games written to {xml_path}")
+    return True
+
+def find_platform(config, base_path, target):
+    """Match a platform by name, folder or path to its folder."""
+    path = os.path.abspath(target)
+    for platform in config.platforms:
+        folder = os.path.join(base_path, "platforms", platform.folder)
+        if target in (platform.name, platform.folder) or path == os.path.abspath(folder):
+            return platform
+    return None
+
+def main(argv=None):
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Build MAMEly.xml for the platforms in config.xml")
+    parser.add_argument("platforms", nargs="*", help="platform names or folders to build")
+    parser.add_argument("--all-platforms", action="store_true",
+                        help="build every platform in config.xml in parallel")
+    parser.add_argument("--merge", action="store_true",
+                        help="update the existing MAMEly.xml, keeping favorite/ignore state")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="worker processes for mame -listxml conversion (default: all cores)")
+    parser.add_argument("--config", default="config.xml", help="main config file")
+    args = parser.parse_args(argv)
+
+    config = Config(base_path, args.config)
+    if args.all_platforms:
+        platforms = list(config.platforms)
+    else:
+        platforms = []
+        for target in args.platforms:
+            platform = find_platform(config, base_path, target)
+            if platform is None:
+                print(f"Unknown platform: {target}")
+                return 1
+            platforms.append(platform)
+    if not platforms:
+        parser.error("name a platform or use --all-platforms")
+
+    def build(platform):
+        platform_path = os.path.join(base_path, "platforms", platform.folder)
+        try:
+            platform_config = PlatformConfig(platform_path, platform.config_file)
+            return generate_platform(platform_path, platform_config, args.merge, args.jobs)
+        except Exception as e:
+            print(f"Error generating {platform.name}: {e}")
+            return False
+
+    # The listxml build runs its own process pool, so threads are enough to overlap platforms
+    with ThreadPoolExecutor(max_workers=len(platforms)) as executor:
+        results = list(executor.map(build, platforms))
+
+    for platform, ok in zip(platforms, results):
+        print(f"{platform.name}: {'done' if ok else 'FAILED'}")
+    return 0 if all(results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
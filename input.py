@@ -17,6 +17,20 @@ class InputManager:
         self.ACTION_EXIT = 10
         self.ACTION_PAGE_UP = 11
         self.ACTION_PAGE_DOWN = 12
+        self.ACTION_SEARCH = 13
+        self.ACTION_BACKSPACE = 14
+        self.ACTION_LETTER = 15
+        self.ACTION_NEXT_LETTER = 16
+        self.ACTION_PREV_LETTER = 17
+
+        # Search mode: printable keys are collected as text instead of mapped to actions
+        self.text_mode = False
+        self.text = ""
+
+        # Event that woke wait(), handled by the next get_action
+        self.pending_events = []
+        # Set when the window needs repainting (e.g. uncovered), cleared by the app
+        self.exposed = False
 
         # Initialize Joysticks
         pygame.joystick.init()
@@ -37,10 +51,13 @@ class InputManager:
         """Process inputs and return the highest priority action."""
         
         # Poll events (needed for pygame internal state)
-        events = pygame.event.get()
+        events = self.pending_events + pygame.event.get()
+        self.pending_events = []
         for event in events:
             if event.type == pygame.QUIT:
                 return self.ACTION_EXIT
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.exposed = True
             elif event.type == pygame.KEYDOWN:
                 # Handle single press events immediately if needed, 
                 # but we'll mostly rely on state checking for continuous movement
@@ -49,6 +66,9 @@ class InputManager:
                 elif event.key == pygame.K_TAB:
                      # Clear queue on tab like original?
                      pygame.event.clear()
+                elif self.text_mode and event.unicode and event.unicode.isprintable() and event.key != pygame.K_SLASH:
+                    # "/" leaves search mode (ACTION_SEARCH) rather than being typed
+                    self.text += event.unicode
 
         # Check raw states for hold/repeat
         keys = pygame.key.get_pressed()
@@ -62,10 +82,15 @@ class InputManager:
         elif keys[pygame.K_RIGHT]: action = self.ACTION_RIGHT
         elif keys[pygame.K_PAGEUP]: action = self.ACTION_PAGE_UP
         elif keys[pygame.K_PAGEDOWN]: action = self.ACTION_PAGE_DOWN
+        elif keys[pygame.K_HOME]: action = self.ACTION_PREV_LETTER
+        elif keys[pygame.K_END]: action = self.ACTION_NEXT_LETTER
         elif keys[pygame.K_RETURN]: action = self.ACTION_RUN
+        elif keys[pygame.K_TAB]: action = self.ACTION_GENRE
+        elif keys[pygame.K_SLASH]: action = self.ACTION_SEARCH
+        elif self.text_mode:
+            if keys[pygame.K_BACKSPACE]: action = self.ACTION_BACKSPACE
         elif keys[pygame.K_e]: action = self.ACTION_PLATFORM
         elif keys[pygame.K_f]: action = self.ACTION_FAVORITE
-        elif keys[pygame.K_TAB]: action = self.ACTION_GENRE
         elif keys[pygame.K_i]: action = self.ACTION_IGNORE
         
         # Joystick Map override
@@ -88,11 +113,15 @@ class InputManager:
                         elif hat[0] == 1: action = self.ACTION_RIGHT
                         
                     # Buttons (Mapping based on original)
-                    # 0: Run, 1: Genre, 2: Platform, 3: Favorite
-                    if joy.get_button(0): action = self.ACTION_RUN
+                    # 0: Run (pick the wheel letter in search mode), 1: Genre, 2: Platform,
+                    # 3: Favorite, 4: Search, 5/6: Next/Previous letter
+                    if joy.get_button(0): action = self.ACTION_LETTER if self.text_mode else self.ACTION_RUN
                     elif joy.get_button(1): action = self.ACTION_GENRE
                     elif joy.get_button(2): action = self.ACTION_PLATFORM
                     elif joy.get_button(3): action = self.ACTION_FAVORITE
+                    elif joy.get_numbuttons() > 4 and joy.get_button(4): action = self.ACTION_SEARCH
+                    elif joy.get_numbuttons() > 5 and joy.get_button(5): action = self.ACTION_NEXT_LETTER
+                    elif joy.get_numbuttons() > 6 and joy.get_button(6): action = self.ACTION_PREV_LETTER
                 except:
                     pass
         
@@ -121,3 +150,19 @@ class InputManager:
                      return action
                      
         return self.ACTION_NONE
+
+    def idle(self):
+        """True when nothing is held, so no repeat is due until a new event arrives."""
+        return self.current_action == self.ACTION_NONE
+
+    def wait(self, timeout):
+        """Block until an input event arrives or timeout milliseconds pass."""
+        event = pygame.event.wait(timeout)
+        if event.type != pygame.NOEVENT:
+            self.pending_events.append(event)
+
+    def take_text(self):
+        """Return the characters typed since the last call (search mode only)."""
+        text = self.text
+        self.text = ""
+        return text
@@ -0,0 +1,78 @@
+import os
+
+JOURNAL_FILE = "MAMEly.journal"
+
+# Fields a journal entry may set on a Rom
+JOURNAL_FIELDS = ("favorite", "ignore")
+
+class StateJournal:
+    """Append-only log of favorite/ignore changes layered over a platform's MAMEly.xml.
+
+    Each line is "<field>\\t<rom name>\\t<value>". Entries hold absolute values, so
+    replaying a journal over a catalog that already contains them is harmless.
+    """
+    def __init__(self, platform_path):
+        self.path = os.path.join(platform_path, JOURNAL_FILE)
+        self.entries = 0
+        self.torn_tail = False
+
+    def replay(self):
+        """Return the logged (field, name, value) changes in the order they were made."""
+        changes = []
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    self.torn_tail = not line.endswith("\n")
+                    parts = line.rstrip("\n").split("\t")
+                    # A torn final line from a power cut is simply dropped
+                    if len(parts) != 3 or parts[0] not in JOURNAL_FIELDS:
+                        continue
+                    try:
+                        changes.append((parts[0], parts[1], int(parts[2])))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        self.entries = len(changes)
+        return changes
+
+    def append(self, field, name, value):
+        try:
+            with open(self.path, "a") as f:
+                if self.torn_tail:
+                    f.write("\n")
+                    self.torn_tail = False
+                f.write(f"{field}\t{name}\t{value}\n")
+            self.entries += 1
+        except OSError as e:
+            print(f"Error writing journal: {e}")
+
+    def mark(self):
+        """Return a (byte offset, entry count) position that trim() can later cut up to."""
+        try:
+            offset = os.path.getsize(self.path)
+        except OSError:
+            offset = 0
+        return (offset, self.entries)
+
+    def trim(self, mark):
+        """Drop the entries before mark once they have been folded into MAMEly.xml."""
+        offset, entries = mark
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                tail = f.read()
+            if tail:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(tail)
+                os.replace(tmp_path, self.path)
+            else:
+                os.remove(self.path)
+                self.torn_tail = False
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error trimming journal: {e}")
+            return
+        self.entries = max(0, self.entries - entries)
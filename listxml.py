@@ -0,0 +1,175 @@
+import io
+import os
+import datetime
+import multiprocessing
+import xml.etree.ElementTree as ET
+from catver import CatverIndex
+from catalog import format_game, merge_catalog, catalog_has_games
+
+GENERATOR_VERSION = "generateMAMElyXML v1.0"
+
+# Bytes of listxml handed to each worker; every chunk starts at a <machine> tag
+CHUNK_SIZE = 8 * 1024 * 1024
+MACHINE_TAG = b"<machine "
+
+def read_catver(path):
+    """Map romname -> (genre, mature) using the shared, cached catver index."""
+    categories = {}
+    index = CatverIndex(path)
+    for romname in index.rows:
+        genre, subgenre, mature = index.get(romname)
+        categories[romname] = (genre.replace("*","-").replace("&","and"), mature)
+    return categories
+
+def find_chunks(path, chunk_size=CHUNK_SIZE):
+    """Split listxml into (offset, length) byte ranges that each hold whole <machine> elements."""
+    total_bytes = os.path.getsize(path)
+    chunks = []
+    with open(path, 'rb') as f:
+        data = f.read(1024 * 1024)
+        start = data.find(MACHINE_TAG, data.find(b"<mame"))
+        if start < 0:
+            return chunks
+
+        while True:
+            # Jump ahead and back up to the next machine boundary after that point
+            pos = start + chunk_size
+            end = -1
+            while pos < total_bytes:
+                f.seek(pos)
+                window = f.read(1024 * 1024)
+                i = window.find(MACHINE_TAG)
+                if i >= 0:
+                    end = pos + i
+                    break
+                if len(window) <= len(MACHINE_TAG):
+                    break
+                # Overlap windows so a tag split across them is still found
+                pos += len(window) - len(MACHINE_TAG)
+            if end < 0:
+                # Last chunk runs up to the closing root tag
+                f.seek(max(start, total_bytes - 4096))
+                tail = f.read()
+                close = tail.rfind(b"</mame>")
+                end = total_bytes - len(tail) + close if close >= 0 else total_bytes
+                chunks.append((start, end - start))
+                return chunks
+            chunks.append((start, end - start))
+            start = end
+
+def init_worker(path, cat):
+    global listxml_path, categories
+    listxml_path = path
+    categories = cat
+
+def process_chunk(chunk):
+    """Convert one chunk of machines to (romname, description, genre, rating) records."""
+    offset, length = chunk
+    with open(listxml_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(length)
+
+    out = []
+    root = None
+    for event, elem in ET.iterparse(io.BytesIO(b"<mame>" + data + b"</mame>"), events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag != "machine":
+            continue
+
+        romname = elem.attrib.get('name')
+        description = elem.findtext("description")
+        description = description.title().replace("&","") if description else ""
+        root.clear()
+
+        category = categories.get(romname)
+        if category is not None:
+            rating = "Rating: Mature" if category[1] else "Rating: General"
+            out.append((romname, description, category[0], rating))
+    return out
+
+def generate_listxml(platform_path, merge=False, jobs=None):
+    """Build platform_path/MAMEly.xml from the mame-listxml.xml and catver.ini in that folder.
+
+    Machines are converted in chunks on a pool of jobs worker processes (default:
+    all cores). Returns True on success.
+    """
+    listxml = os.path.join(platform_path, "mame-listxml.xml")
+    xml_path = os.path.join(platform_path, "MAMEly.xml")
+
+    print("Reading catver.ini")
+    categories = read_catver(os.path.join(platform_path, "catver.ini"))
+    print("{} roms in catver.ini".format(len(categories)))
+
+    print("Reading mame-listxml.xml")
+    if not os.path.exists(listxml):
+        print("\n\n\nCannot find mame-listxml.xml\n\n\n")
+        return False
+
+    chunks = find_chunks(listxml)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(chunks)))
+    print("{} chunks on {} worker(s)".format(len(chunks), jobs))
+
+    date = datetime.datetime.now()
+    tmp_path = xml_path + ".tmp"
+    numRomsFound = 0
+    pool = None
+
+    try:
+        if jobs > 1:
+            pool = multiprocessing.Pool(jobs, initializer=init_worker, initargs=(listxml, categories))
+            # imap hands results back in chunk order, so the output is deterministic
+            results = pool.imap(process_chunk, chunks)
+        else:
+            init_worker(listxml, categories)
+            results = map(process_chunk, chunks)
+
+        if merge:
+            games = (game for records in results for game in records)
+            merged = merge_catalog(xml_path, games, GENERATOR_VERSION)
+            if merged is None:
+                return False
+            added, removed, changed = merged
+            print("MAMEly.xml merged: {} added, {} removed, {} changed".format(added, removed, changed))
+            return True
+
+        with open(tmp_path, "w", buffering=1024 * 1024) as f:
+            f.write("<?xml version=\"1.0\"?>\n")
+            f.write("<menu>\n")
+            f.write("  <header>\n")
+            f.write("    <listname>MAMEly</listname>\n")
+            f.write("    <lastlistupdate>{}</lastlistupdate>\n".format(date))
+            f.write("    <listgeneratorversion>{}</listgeneratorversion>\n".format(GENERATOR_VERSION))
+            f.write("  </header>\n")
+
+            lastPct = -1
+            for i, records in enumerate(results):
+                for romname, description, genre, rating in records:
+                    f.write(format_game(romname, [("description", description), ("genre", genre), ("rating", rating)]))
+                numRomsFound += len(records)
+                pct = round((i + 1) / len(chunks) * 100)
+                if pct != lastPct:
+                    lastPct = pct
+                    print("Writing xml file ({}% complete)".format(pct))
+
+            f.write("</menu>\n")
+    except ET.ParseError as e:
+        print("Error parsing mame-listxml.xml: {}".format(e))
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if numRomsFound == 0 and catalog_has_games(xml_path):
+        print("No games found in mame-listxml.xml, keeping the existing MAMEly.xml")
+        os.remove(tmp_path)
+        return False
+
+    os.replace(tmp_path, xml_path)
+    print("{} games written to MAMEly.xml".format(numRomsFound))
+    return True
@@ -1,13 +1,49 @@
 import sys
 import os
 import time
+import bisect
 import pygame
+from concurrent.futures import ThreadPoolExecutor
 from config import Config, PlatformConfig, SkinConfig
 from roms import RomManager
+from romdb import SqliteRomManager
 from ui import UIManager
 from input import InputManager
 from version import __version__
 
+# Letters offered by the on-screen search wheel (joystick search)
+SEARCH_WHEEL = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 "
+
+# Longest sleep while idle, so catalog changes from the watcher/verifier still show up promptly
+IDLE_WAIT_MS = 500
+
+def letter_key(rom):
+    """Initial a ROM is grouped under for letter jumps; digits and symbols share "#"."""
+    c = rom.description[:1]
+    return c.upper() if c.isalpha() else "#"
+
+def build_letter_table(roms):
+    """Return the start index of each run of ROMs sharing a letter_key.
+
+    One pass when a view is built: symbols sort on both sides of the letters and
+    fuzzy results are ranked, so runs cannot be found by searching. Jumps then
+    bisect into this table.
+    """
+    starts = []
+    previous = None
+    previous_char = None
+    for i, rom in enumerate(roms):
+        c = rom.description[:1]
+        # Neighbours mostly share their first character, so only a new one needs a key
+        if c == previous_char:
+            continue
+        previous_char = c
+        key = letter_key(rom)
+        if key != previous:
+            starts.append(i)
+            previous = key
+    return starts
+
 class MAMElyApp:
     def __init__(self):
         # Initialize Pygame
@@ -39,11 +75,21 @@ class MAMElyApp:
         self.ui = None
         self.input = InputManager()
         
+        # Platforms parsed ahead of time (platform index -> Future), see Config.preload_platforms
+        self.preload_pool = None
+        self.preloaded = {}
+        
         # View State
         self.genre_list = []
         self.current_genre_idx = 0
         self.rom_list = []
         self.selected_rom_idx = 0
+        self.letter_starts = []  # first index of each initial in rom_list, see build_letter_table
+        
+        # Search mode: None when off, else the text the current view is narrowed to
+        self.search_query = None
+        self.search_fuzzy = False  # showing ranked fuzzy matches because nothing contains the query
+        self.search_wheel_idx = 0
         
         # Messages
         self.message = ""
@@ -53,40 +99,106 @@ class MAMElyApp:
         # Confirmation Logic
         self.confirm_action = None
         self.confirm_message = ""
+        
+        # Redraw only when something on screen changed
+        self.dirty = True
 
-    def load_platform(self):
-        if not self.config.platforms:
-            print("No platforms definitions found.")
-            self.running = False
-            return
+    def new_rom_manager(self, platform_path, p_conf):
+        if p_conf.catalog_backend == "sqlite":
+            return SqliteRomManager(platform_path, p_conf)
+        return RomManager(platform_path, p_conf)
 
-        p_def = self.config.platforms[self.platform_idx]
+    def build_platform(self, idx):
+        """Load configs, background and ROM catalog for one platform. Runs on preload worker threads."""
+        p_def = self.config.platforms[idx]
         platform_path = os.path.join(self.base_path, "platforms", p_def.folder)
         
-        print(f"Loading platform: {p_def.name}")
-        
-        # Load Configs
         p_conf = PlatformConfig(platform_path, p_def.config_file)
-        self.skin = SkinConfig(platform_path, p_def.skin_file)
+        skin = SkinConfig(platform_path, p_def.skin_file)
+        background = UIManager.read_background(skin)
+        
+        rom_manager = self.new_rom_manager(platform_path, p_conf)
+        rom_manager.load_skips_and_flags()
+        rom_manager.load_roms()
+        print(f"Preloaded platform: {p_def.name}")
+        return p_conf, skin, background, rom_manager
+
+    def start_preload(self):
+        """Parse every platform on a worker pool, current platform first."""
+        count = len(self.config.platforms)
+        self.preload_pool = ThreadPoolExecutor(max_workers=min(count, os.cpu_count() or 1))
+        for n in range(count):
+            idx = (self.platform_idx + n) % count
+            self.preloaded[idx] = self.preload_pool.submit(self.build_platform, idx)
+
+    def is_preloaded(self, rom_manager):
+        for future in self.preloaded.values():
+            if future.done() and future.exception() is None and future.result()[3] is rom_manager:
+                return True
+        return False
+
+    def apply_skin(self, background=None):
         self.message_duration = self.skin.get("messageTime", 2)
         
         # Initialize UI (re-init for potentially different background/res)
         # Note: In real scenarios we might want to keep the window open, 
         # but here we follow original flow closest regarding skin loading.
         if self.ui is None:
-             self.ui = UIManager(self.config, self.skin)
+             self.ui = UIManager(self.config, self.skin, background)
         else:
              self.ui.skin = self.skin
-             self.ui.load_background()
+             self.ui.load_background(background)
 
-        # Load ROMs
-        self.ui.begin_frame()
-        self.ui.show_message("Reading MAMEly.xml", self.skin.get("defaultMessageColor"))
-        self.ui.end_frame()
+    def load_platform(self):
+        if not self.config.platforms:
+            print("No platforms definitions found.")
+            self.running = False
+            return
+
+        p_def = self.config.platforms[self.platform_idx]
+        platform_path = os.path.join(self.base_path, "platforms", p_def.folder)
         
-        self.rom_manager = RomManager(platform_path, p_conf)
-        self.rom_manager.load_skips_and_flags()
-        self.rom_manager.load_roms() # Synchronous for now, could add progress callback
+        print(f"Loading platform: {p_def.name}")
+        
+        platform = None
+        future = self.preloaded.get(self.platform_idx)
+        if future is not None:
+            # Still parsing (only likely right after startup): say so on the current screen
+            if not future.done() and self.ui is not None:
+                self.ui.begin_frame()
+                self.ui.show_message("Reading MAMEly.xml", self.skin.get("defaultMessageColor"))
+                self.ui.end_frame()
+            try:
+                platform = future.result()
+            except Exception as e:
+                print(f"Platform preload failed, loading directly: {e}")
+                del self.preloaded[self.platform_idx]
+        
+        # Preloaded catalogs stay alive for the next switch, others are closed;
+        # either way the outgoing platform's catalog hits the disk
+        if self.rom_manager:
+            if self.is_preloaded(self.rom_manager):
+                self.rom_manager.flush()
+            else:
+                self.rom_manager.close()
+        
+        if platform is not None:
+            p_conf, self.skin, background, self.rom_manager = platform
+            self.apply_skin(background)
+        else:
+            # Load Configs
+            p_conf = PlatformConfig(platform_path, p_def.config_file)
+            self.skin = SkinConfig(platform_path, p_def.skin_file)
+            self.apply_skin()
+
+            # Load ROMs
+            self.ui.begin_frame()
+            self.ui.show_message("Reading MAMEly.xml", self.skin.get("defaultMessageColor"))
+            self.ui.end_frame()
+            
+            self.rom_manager = self.new_rom_manager(platform_path, p_conf)
+            self.rom_manager.load_skips_and_flags()
+            self.rom_manager.load_roms() # Synchronous for now, could add progress callback
         
         # Default to Favorites if available
         self.genre_list = self.rom_manager.get_genre_list()
@@ -106,7 +218,17 @@ class MAMElyApp:
             self.current_genre_idx = 0
             
         current_genre = self.genre_list[self.current_genre_idx]
-        self.rom_list = self.rom_manager.get_roms_by_genre(current_genre)
+        self.search_fuzzy = False
+        if self.search_query:
+            self.rom_list = self.rom_manager.search_roms(current_genre, self.search_query)
+            if not self.rom_list and len(self.search_query) >= 3:
+                # Nothing contains the text as typed: fall back to the closest matches
+                self.rom_list = self.rom_manager.fuzzy_search_roms(current_genre, self.search_query)
+                self.search_fuzzy = bool(self.rom_list)
+        else:
+            self.rom_list = self.rom_manager.get_roms_by_genre(current_genre)
+        self.letter_starts = build_letter_table(self.rom_list)
+        self.dirty = True
         
         if reset_selection:
             self.selected_rom_idx = 0
@@ -115,9 +237,80 @@ class MAMElyApp:
         if self.selected_rom_idx >= len(self.rom_list):
              self.selected_rom_idx = max(0, len(self.rom_list) - 1)
 
+    def refresh_rom_list(self):
+        """Pick up ROMs the directory watcher or verifier changed, keeping the selected ROM if it is still listed."""
+        selected = self.rom_list[self.selected_rom_idx].name if self.rom_list else None
+        # Genres can appear or disappear (e.g. "Not Working"), so keep the current one by name
+        genre = self.genre_list[self.current_genre_idx] if self.genre_list else None
+        self.genre_list = self.rom_manager.get_genre_list()
+        if genre in self.genre_list:
+            self.current_genre_idx = self.genre_list.index(genre)
+        self.update_view_lists(reset_selection=False)
+        for i, rom in enumerate(self.rom_list):
+            if rom.name == selected:
+                self.selected_rom_idx = i
+                break
+
+    def jump_letter(self, step):
+        """Move to the first ROM of the next (step 1) or previous (step -1) initial."""
+        starts = self.letter_starts
+        if not starts:
+            return
+        run = bisect.bisect_right(starts, self.selected_rom_idx) - 1
+        if step < 0 and self.selected_rom_idx > starts[run]:
+            # Back to the top of the current letter first
+            self.selected_rom_idx = starts[run]
+        else:
+            self.selected_rom_idx = starts[(run + step) % len(starts)]
+
+    def set_search(self, query):
+        """Narrow the current view to query (None leaves search mode), keeping the selected ROM if it is still listed."""
+        selected = self.rom_list[self.selected_rom_idx].name if self.rom_list else None
+        if query is not None and self.search_query is None:
+            self.rom_manager.prepare_search()
+        self.search_query = query
+        self.input.text_mode = query is not None
+        self.update_view_lists()
+        for i, rom in enumerate(self.rom_list):
+            if rom.name == selected:
+                self.selected_rom_idx = i
+                break
+
+    def handle_search_input(self, action):
+        """Search mode keys. Returns True if the action was consumed."""
+        query = self.search_query
+        typed = self.input.take_text()
+        if typed:
+            query += typed
+        
+        if action in (self.input.ACTION_SEARCH, self.input.ACTION_EXIT):
+            self.set_search(None)
+            return True
+        elif action in (self.input.ACTION_BACKSPACE, self.input.ACTION_GENRE):
+            query = query[:-1]
+        elif action == self.input.ACTION_LEFT:
+            self.search_wheel_idx = (self.search_wheel_idx - 1) % len(SEARCH_WHEEL)
+        elif action == self.input.ACTION_RIGHT:
+            self.search_wheel_idx = (self.search_wheel_idx + 1) % len(SEARCH_WHEEL)
+        elif action == self.input.ACTION_LETTER:
+            query += SEARCH_WHEEL[self.search_wheel_idx]
+        
+        if query != self.search_query:
+            self.set_search(query)
+        return action in (self.input.ACTION_BACKSPACE, self.input.ACTION_GENRE, self.input.ACTION_LEFT,
+                          self.input.ACTION_RIGHT, self.input.ACTION_LETTER)
+
     def set_message(self, msg):
         self.message = msg
         self.message_start_time = time.time()
+        self.dirty = True
+
+    def idle_timeout(self):
+        """Milliseconds the main loop may sleep: until the current message expires, at most IDLE_WAIT_MS."""
+        if not self.message:
+            return IDLE_WAIT_MS
+        remaining = self.message_start_time + self.message_duration - time.time()
+        return max(1, min(IDLE_WAIT_MS, int(remaining * 1000) + 1))
 
     def run_rom(self):
         if not self.rom_list: return
@@ -133,14 +326,26 @@ class MAMElyApp:
         exe = self.rom_manager.config.emulator_executable
         
         cmd = f"{exe} {flags} {full_rom_path}"
+        
+        # Persist pending catalog changes before the emulator takes over
+        self.rom_manager.flush()
+        
         print(f"Executing: {cmd}")
         os.system(cmd)
         
         # Clear input queue after return
         pygame.event.clear()
+        # The emulator had the display, so repaint all of it
+        self.ui.invalidate()
 
     def handle_input(self):
         action = self.input.get_action()
+        # Any action, typed text or window exposure may change the screen
+        if action != self.input.ACTION_NONE or self.input.text or self.input.exposed:
+            if self.input.exposed:
+                self.ui.invalidate()
+                self.input.exposed = False
+            self.dirty = True
         
         # Confirmation Overlay Logic
         if self.confirm_action:
@@ -156,11 +361,19 @@ class MAMElyApp:
                 self.confirm_message = ""
             return
         
+        if self.search_query is not None and self.handle_search_input(action):
+            return
+        
         if action == self.input.ACTION_EXIT:
             self.running = False
             
+        elif action == self.input.ACTION_SEARCH:
+            self.set_search("")
+            
         elif action == self.input.ACTION_PLATFORM:
             self.platform_idx = (self.platform_idx + 1) % len(self.config.platforms)
+            self.search_query = None
+            self.input.text_mode = False
             self.load_platform()
             
         elif action == self.input.ACTION_GENRE:
@@ -185,6 +398,12 @@ class MAMElyApp:
             if self.rom_list:
                 self.selected_rom_idx = min(len(self.rom_list) - 1, self.selected_rom_idx + lines)
 
+        elif action == self.input.ACTION_NEXT_LETTER:
+            self.jump_letter(1)
+            
+        elif action == self.input.ACTION_PREV_LETTER:
+            self.jump_letter(-1)
+
         elif action == self.input.ACTION_FAVORITE:
             if self.rom_list:
                 rom = self.rom_list[self.selected_rom_idx]
@@ -222,7 +441,10 @@ class MAMElyApp:
         
         # 1. Draw Genre Set
         cur_genre = self.genre_list[self.current_genre_idx] if self.genre_list else ""
-        if cur_genre not in ["All Games", "Favorites", "Ignore"]:
+        if self.search_query is not None:
+             label = "Closest to" if self.search_fuzzy else "Search"
+             text = f"{label}: {self.search_query}_  <{SEARCH_WHEEL[self.search_wheel_idx]}>"
+        elif cur_genre not in ["All Games", "Favorites", "Ignore"]:
              text = "Genre: " + cur_genre
         else:
              text = cur_genre
@@ -295,11 +517,8 @@ class MAMElyApp:
                                        self.skin.get("romSnapX2"), self.skin.get("romSnapY2"),
                                        fallback_path=path2)
                                        
-                    # Draw Genre/Rating or Message
+                    # Draw Genre/Rating or Message (expired by the main loop)
                     msg = self.message
-                    if msg:
-                        if time.time() - self.message_start_time > self.message_duration:
-                            self.message = ""
                     
                     gx = self.skin.get("romGenreXCenter")
                     gy = self.skin.get("romGenreYCenter")
@@ -352,14 +571,44 @@ class MAMElyApp:
             self.ui.draw_modal(self.confirm_message)
             
         self.ui.end_frame()
+        self.dirty = False
+
+    def close_platforms(self):
+        """Flush and close every loaded catalog."""
+        managers = [self.rom_manager] if self.rom_manager else []
+        for future in self.preloaded.values():
+            try:
+                managers.append(future.result()[3])
+            except Exception as e:
+                print(f"Platform preload failed: {e}")
+        for manager in set(managers):
+            manager.close()
+        if self.preload_pool:
+            self.preload_pool.shutdown()
 
     def run(self):
+        if self.config.preload_platforms and self.config.platforms:
+            self.start_preload()
         self.load_platform()
         
         while self.running:
+            if self.rom_manager.consume_changes():
+                self.refresh_rom_list()
             self.handle_input()
-            self.draw()
+            if self.message and time.time() - self.message_start_time > self.message_duration:
+                self.message = ""
+                self.dirty = True
+            
+            if self.dirty:
+                self.draw()
+            elif self.input.idle():
+                # Nothing to show and nothing held: sleep until an event or the next deadline
+                self.input.wait(self.idle_timeout())
+            else:
+                # A held key or stick between repeats
+                self.ui.clock.tick(60)
         
+        self.close_platforms()
         pygame.quit()
 
 if __name__ == "__main__":
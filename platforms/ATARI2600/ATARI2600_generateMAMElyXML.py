@@ -1,35 +1,10 @@
 import os
-import datetime
-romExtension = ".bin"
-date = datetime.datetime.now()
+import sys
 
-f_out = open("MAMEly.xml","w")
-f_in = open("romlist.txt","r")
+# The generator lives in generate.py at the top of the MAMEly tree and reads this
+# platform's romDirectory/romExtension from its entry in config.xml
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from generate import main
 
-
-f_out.write("<?xml version=\"1.0\"?>\n")
-f_out.write("<menu>\n")
-f_out.write("   <header>\n")
-f_out.write("       <listname>MAMEly</listname>\n")
-f_out.write("       <lastlistupdate>{}</lastlistupdate>\n".format(date))
-f_out.write("       <listgeneratorversion>makeMAMEly-xml v1.0</listgeneratorversion>\n")
-f_out.write("   </header>\n")
-
-
-for textline in f_in:
-    if textline.find(romExtension) >= 0:
-        textline = textline.strip()
-        textline = textline.replace("&","and")    
-        textline = textline.replace("*","-")
-        textline = textline.replace(romExtension,"")
-
-        f_out.write("   <game name=\"{}\">\n".format(textline+romExtension))
-        f_out.write("       <description>{}</description>\n".format(textline))
-        f_out.write("   </game>\n")
-    
-f_out.write("</menu>")
-f_in.close()
-f_out.close()
-
-
-     
+if __name__ == "__main__":
+    sys.exit(main(["ATARI2600"] + sys.argv[1:]))
@@ -0,0 +1,301 @@
+import os
+import sqlite3
+import weakref
+import xml.etree.ElementTree as ET
+from sqlite3 import Error
+from roms import Rom, RomManager, NOT_WORKING, FUZZY_LIMIT, JOURNAL_COMPACT_ENTRIES
+from catalog import iter_games
+
+DB_FILE = "MAMEly.db"
+
+SQL_CREATE_ROMS_TABLE = """CREATE TABLE IF NOT EXISTS roms (
+                               romname text PRIMARY KEY,
+                               description text NOT NULL,
+                               genre text,
+                               rating text,
+                               favorite integer,
+                               ignore integer
+                           );"""
+
+SQL_CREATE_META_TABLE = """CREATE TABLE IF NOT EXISTS meta (
+                               key text PRIMARY KEY,
+                               value text
+                           );"""
+
+# Every view query filters on one of these and returns rows ordered by description,
+# so each index ends in description (rowid breaks ties in XML order)
+SQL_CREATE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_roms_description ON roms(description)",
+    "CREATE INDEX IF NOT EXISTS idx_roms_genre ON roms(genre, ignore, description)",
+    "CREATE INDEX IF NOT EXISTS idx_roms_rating ON roms(rating)",
+    "CREATE INDEX IF NOT EXISTS idx_roms_favorite ON roms(favorite, description)",
+    "CREATE INDEX IF NOT EXISTS idx_roms_ignore ON roms(ignore, description)",
+]
+
+ROM_COLUMNS = "romname, description, genre, rating, favorite, ignore"
+
+class SqliteRomManager(RomManager):
+    """RomManager backed by a per-platform SQLite catalog (MAMEly.db).
+
+    MAMEly.xml is imported once, and again whenever it or the skip files change.
+    Views and counts are indexed queries, and favorite/ignore toggles are single-row
+    UPDATEs, so the catalog is never held in Python objects as a whole.
+    """
+    def __init__(self, platform_path, platform_config):
+        super().__init__(platform_path, platform_config)
+        self.db_path = os.path.join(platform_path, DB_FILE)
+        self.conn = None
+        self.present = None  # ROM names found on disk when compareXMLtoRoms is set
+        # Rom objects currently handed out in views, so toggles update what the UI holds
+        self.live_roms = weakref.WeakValueDictionary()
+        # Names in each view, for filtering fuzzy search results; dropped whenever views change
+        self.view_names = {}
+
+    def connect(self):
+        try:
+            # Preloading may open the catalog on a worker thread; access is serialized by self.lock
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            with self.conn:
+                self.conn.execute(SQL_CREATE_ROMS_TABLE)
+                self.conn.execute(SQL_CREATE_META_TABLE)
+                for sql in SQL_CREATE_INDEXES:
+                    self.conn.execute(sql)
+        except Error as e:
+            print(f"Error opening catalog database: {e}")
+            self.conn = None
+
+    def xml_signature(self):
+        return ",".join(str(v) for v in self.cache.signature())
+
+    def load_roms(self, callback_progress=None):
+        """Open the database, importing MAMEly.xml if it changed since the last import.
+
+        MAMEly.journal holds toggles not yet folded into MAMEly.xml (made by either
+        backend), so it is replayed over the table on every load.
+        """
+        self.connect()
+        if self.conn is None:
+            return
+
+        changes = self.journal.replay()
+        signature = self.xml_signature()
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        if row is None or row[0] != signature:
+            if self.import_xml(signature, changes, callback_progress) and changes:
+                # Fold the replayed toggles into MAMEly.xml, which trims the journal
+                self.writer.request()
+        else:
+            self.replay_changes(changes)
+            if callback_progress:
+                callback_progress(100)
+
+        self.genres = set(r[0] for r in self.conn.execute(
+            "SELECT DISTINCT genre FROM roms WHERE genre != 'General'"))
+        self.ratings = set(r[0] for r in self.conn.execute(
+            "SELECT DISTINCT rating FROM roms WHERE rating != 'General'"))
+
+        if self.config.compare_xml_to_roms:
+            self.present = self.scan_rom_directory()
+            self.start_watching()
+        self.start_verifying()
+        
+        if self.xml_writable and self.journal.entries >= JOURNAL_COMPACT_ENTRIES:
+            self.writer.request()
+
+    def replay_changes(self, changes):
+        """Apply journaled (field, name, value) toggles to the roms table."""
+        if not changes:
+            return
+        with self.lock, self.conn:
+            for field, name, value in changes:
+                self.conn.execute(f"UPDATE roms SET {field} = ? WHERE romname = ?", (value, name))
+
+    def import_xml(self, signature, changes=(), callback_progress=None):
+        """Replace the roms table with MAMEly.xml plus the journaled toggles. Returns True on success.
+
+        MAMEly.xml and the journal together are the saved favorite/ignore state, as
+        toggles made here are journaled and exported like the XML backend's.
+        """
+        xml_path = os.path.join(self.platform_path, "MAMEly.xml")
+        if not os.path.exists(xml_path):
+            return False
+        print(f"Importing {xml_path} into {self.db_path}")
+
+        user_state = {}
+        for field, name, value in changes:
+            user_state.setdefault(name, {})[field] = value
+
+        try:
+            with self.conn:
+                self.conn.execute("DELETE FROM roms")
+                rows = []
+                for name, fields in iter_games(xml_path, callback_progress):
+                    rom = self.rom_from_game(name, fields)
+                    if rom is None:
+                        continue
+                    for field, value in user_state.get(name, {}).items():
+                        setattr(rom, field, value)
+                    rows.append(rom.record())
+                self.conn.executemany(f"INSERT OR REPLACE INTO roms({ROM_COLUMNS}) VALUES(?,?,?,?,?,?)", rows)
+                self.conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES('signature', ?)", (signature,))
+        except ET.ParseError as e:
+            # The transaction rolled back, so the previous import is still in the database
+            print(f"XML Parse Error: {e}")
+            self.xml_writable = False
+            return False
+        return True
+
+    def _set_present(self, name, present):
+        if present and name not in self.present:
+            self.present.add(name)
+            self.view_names = {}
+            return True
+        if not present and name in self.present:
+            self.present.discard(name)
+            self.view_names = {}
+            return True
+        return False
+
+    def build_views(self):
+        # Views are queries against the database
+        self.view_names = {}
+
+    def _where(self, genre_name):
+        if genre_name in ("All Games", NOT_WORKING):
+            return "ignore = 0", ()
+        elif genre_name == "Favorites":
+            return "favorite = 1", ()
+        elif genre_name == "Ignore":
+            return "ignore = 1", ()
+        return "genre = ? AND ignore = 0", (genre_name,)
+
+    def _visible(self, name, genre_name):
+        """Apply the on-disk and verification filters the XML backend bakes into its views."""
+        if self.present is not None and name not in self.present:
+            return False
+        if name in self.broken:
+            return self.config.verify_roms == "genre" and genre_name in (NOT_WORKING, "Ignore")
+        return genre_name != NOT_WORKING
+
+    def _roms_from_rows(self, rows, genre_name):
+        """Turn view rows into Rom objects, reusing the ones the UI already holds."""
+        results = []
+        for row in rows:
+            if not self._visible(row[0], genre_name):
+                continue
+            rom = self.live_roms.get(row[0])
+            if rom is None:
+                rom = self.live_roms[row[0]] = Rom(*row)
+            results.append(rom)
+        return results
+
+    def get_roms_by_genre(self, genre_name):
+        """Return ROMs for a given genre category, sorted by description."""
+        if self.conn is None:
+            return []
+        where, args = self._where(genre_name)
+        with self.lock:
+            rows = self.conn.execute(f"SELECT {ROM_COLUMNS} FROM roms WHERE {where} "
+                                     "ORDER BY description, rowid", args).fetchall()
+            return self._roms_from_rows(rows, genre_name)
+
+    def count_roms_by_genre(self, genre_name):
+        if self.conn is None:
+            return 0
+        where, args = self._where(genre_name)
+        with self.lock:
+            if self.present is None and not self.broken and genre_name != NOT_WORKING:
+                return self.conn.execute(f"SELECT COUNT(*) FROM roms WHERE {where}", args).fetchone()[0]
+            return sum(1 for (name,) in self.conn.execute(f"SELECT romname FROM roms WHERE {where}", args)
+                       if self._visible(name, genre_name))
+
+    def search_roms(self, genre_name, query):
+        """Return the ROMs of a view whose description contains query (case-insensitive), sorted by description."""
+        if self.conn is None:
+            return []
+        if not query:
+            return self.get_roms_by_genre(genre_name)
+        where, args = self._where(genre_name)
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self.lock:
+            rows = self.conn.execute(f"SELECT {ROM_COLUMNS} FROM roms WHERE {where} "
+                                     "AND description LIKE ? ESCAPE '\\' ORDER BY description, rowid",
+                                     args + (pattern,)).fetchall()
+            return self._roms_from_rows(rows, genre_name)
+
+    def search_entries(self):
+        if self.conn is None:
+            return []
+        with self.lock:
+            return self.conn.execute("SELECT romname, description FROM roms ORDER BY rowid").fetchall()
+
+    def fuzzy_search_roms(self, genre_name, query, limit=FUZZY_LIMIT):
+        if self.conn is None:
+            return []
+        with self.lock:
+            index = self.search_index
+            if index is None:
+                self.prepare_search()
+                return []
+            in_view = self.view_names.get(genre_name)
+            if in_view is None:
+                where, args = self._where(genre_name)
+                in_view = self.view_names[genre_name] = set(
+                    name for (name,) in self.conn.execute(f"SELECT romname FROM roms WHERE {where}", args)
+                    if self._visible(name, genre_name))
+            names = index.names
+            results = index.query(query, limit, lambda i: names[i] in in_view)
+            ranked = [names[i] for score, i in results]
+            if not ranked:
+                return []
+            rows = self.conn.execute(f"SELECT {ROM_COLUMNS} FROM roms WHERE romname IN "
+                                     f"({','.join('?' * len(ranked))})", ranked).fetchall()
+            by_name = {row[0]: row for row in rows}
+            return self._roms_from_rows([by_name[name] for name in ranked if name in by_name], genre_name)
+
+    def _toggle(self, rom_name, field):
+        if self.conn is None:
+            return False
+        with self.lock:
+            with self.conn:
+                cur = self.conn.execute(f"UPDATE roms SET {field} = 1 - {field} WHERE romname = ?", (rom_name,))
+                if cur.rowcount == 0:
+                    return False
+                self.view_names = {}
+                row = self.conn.execute(f"SELECT {field} FROM roms WHERE romname = ?", (rom_name,)).fetchone()
+            # Journaled like the XML backend, so the change reaches MAMEly.xml and survives a backend switch
+            self.record_change(field, rom_name, row[0])
+            rom = self.live_roms.get(rom_name)
+            if rom is not None:
+                setattr(rom, field, row[0])
+        return row[0] == 1
+
+    def toggle_favorite(self, rom_name):
+        return self._toggle(rom_name, "favorite")
+
+    def toggle_ignore(self, rom_name):
+        return self._toggle(rom_name, "ignore")
+
+    def save_xml(self):
+        """Export the database back to MAMEly.xml (favorites.txt/ignore.txt included)."""
+        if self.conn is None:
+            return False
+        saved = super().save_xml()
+        if saved:
+            # The export matches the database, so it must not trigger a re-import
+            signature = self.xml_signature()
+            with self.lock, self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES('signature', ?)", (signature,))
+        return saved
+
+    def catalog_records(self):
+        # Called by save_xml under self.lock, so no toggle lands between this and the journal mark
+        return [tuple(row) for row in self.conn.execute(f"SELECT {ROM_COLUMNS} FROM roms ORDER BY rowid")]
+
+    def close(self):
+        super().close()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
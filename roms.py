@@ -2,21 +2,115 @@ import os
 import xml.etree.ElementTree as ET
 import datetime
 import operator
+import bisect
+import threading
+from array import array
+from catalog import CatalogCache, DirectoryListingCache, iter_games, format_game
+from journal import StateJournal
+from writer import CatalogWriter
+from watcher import RomDirectoryWatcher
+from catver import CatverIndex
+from verify import SetVerifier
+from search import TrigramIndex
+
+# Virtual genre holding sets that failed verification (verifyRoms = Genre)
+NOT_WORKING = "Not Working"
+
+# Ranked matches returned by fuzzy search
+FUZZY_LIMIT = 50
+
+# Journal entries allowed to pile up before they are folded into MAMEly.xml
+JOURNAL_COMPACT_ENTRIES = 500
+
+def search_key(text):
+    """Normalized form of a description that search queries are matched against."""
+    return text.casefold()
+
+class StringTable:
+    """Interned strings addressed by small integer codes, shared by every loaded catalog.
+
+    Platforms preload on several threads, so new strings are added under a lock;
+    strings are never removed, so lookups of known strings need none.
+    """
+    def __init__(self):
+        self.strings = []
+        self.codes = {}
+        self.lock = threading.Lock()
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            with self.lock:
+                code = self.codes.get(value)
+                if code is None:
+                    # Append before publishing the code, so strings[code] always exists
+                    self.strings.append(value)
+                    code = self.codes[value] = len(self.strings) - 1
+        return code
+
+# Genre and rating names repeat across thousands of ROMs and every platform
+GENRES = StringTable()
+RATINGS = StringTable()
+
+# Layout of Rom._bits: favorite and ignore flags, then genre and rating codes
+FAVORITE_BIT = 1
+IGNORE_BIT = 2
+GENRE_SHIFT = 2
+RATING_SHIFT = 22
+CODE_MASK = (1 << 20) - 1
 
 class Rom:
+    """One catalog entry. Genre, rating and the favorite/ignore flags are packed into one int."""
+    __slots__ = ("name", "description", "_bits", "__weakref__")
+
     def __init__(self, name, description, genre, rating, favorite=0, ignore=0):
         self.name = name
         self.description = description
-        self.genre = genre
-        self.rating = rating
-        self.favorite = int(favorite)
-        self.ignore = int(ignore)
+        self._bits = (GENRES.code(genre) << GENRE_SHIFT) | (RATINGS.code(rating) << RATING_SHIFT)
+        self.favorite = favorite
+        self.ignore = ignore
+
+    @property
+    def genre(self):
+        return GENRES.strings[(self._bits >> GENRE_SHIFT) & CODE_MASK]
+
+    @genre.setter
+    def genre(self, value):
+        self._bits = (self._bits & ~(CODE_MASK << GENRE_SHIFT)) | (GENRES.code(value) << GENRE_SHIFT)
+
+    @property
+    def rating(self):
+        return RATINGS.strings[(self._bits >> RATING_SHIFT) & CODE_MASK]
+
+    @rating.setter
+    def rating(self, value):
+        self._bits = (self._bits & ~(CODE_MASK << RATING_SHIFT)) | (RATINGS.code(value) << RATING_SHIFT)
+
+    @property
+    def favorite(self):
+        return self._bits & FAVORITE_BIT
+
+    @favorite.setter
+    def favorite(self, value):
+        self._bits = (self._bits | FAVORITE_BIT) if int(value) else (self._bits & ~FAVORITE_BIT)
+
+    @property
+    def ignore(self):
+        return (self._bits & IGNORE_BIT) >> 1
+
+    @ignore.setter
+    def ignore(self, value):
+        self._bits = (self._bits | IGNORE_BIT) if int(value) else (self._bits & ~IGNORE_BIT)
+
+    def record(self):
+        return (self.name, self.description, self.genre, self.rating, self.favorite, self.ignore)
 
 class RomManager:
     def __init__(self, platform_path, platform_config):
         self.platform_path = platform_path
         self.config = platform_config
         self.roms = {}  # Dictionary of name -> Rom object
+        self.catalog = {}  # Every ROM in MAMEly.xml, present on disk or not
         self.genres = set()
         self.ratings = set()
         
@@ -24,6 +118,48 @@ class RomManager:
         self.skip_genres = set()
         self.skip_ratings = set()
         self.flag_options = {}
+        self.catver = None  # CatverIndex for platforms that ship a catver.ini, loaded on first use
+        
+        # View indexes: the catalog sorted once by description, plus per-view lists of
+        # positions in that order ("All Games", "Favorites", "Ignore", each genre) holding
+        # the ROMs that are present; ranks cover the whole catalog, so files coming and
+        # going only insert or remove positions
+        self.sorted_roms = []
+        self.sort_rank = {}
+        self.views = {}
+        
+        # Search keys (folded descriptions) by position in sorted_roms, and the last
+        # (view, query, positions) so a growing query only narrows the previous result
+        self.search_keys = []
+        self.last_search = None
+        
+        # Trigram index for fuzzy search (MAMEly.search), loaded in the background on first use
+        self.search_index = None
+        self.search_index_thread = None
+        self.entry_ranks = None  # index entry -> position in sorted_roms
+        
+        # Compiled copy of MAMEly.xml, validated against the XML and skip/flag files
+        self.cache = CatalogCache(platform_path)
+        
+        # Favorite/ignore changes made since MAMEly.xml was last written
+        self.journal = StateJournal(platform_path)
+        
+        # Full XML rewrites run on a background thread, debounced
+        self.lock = threading.RLock()
+        self.writer = CatalogWriter(self.save_xml)
+        # Cleared when MAMEly.xml failed to parse, so it is never rewritten from a partial read
+        self.xml_writable = True
+        
+        # Live ROM directory watching (watchRomDirectory), see apply_rom_changes
+        self.rom_files = []
+        self.watcher = None
+        self.roms_changed = False
+        
+        # ROM sets found incomplete by background verification (verifyRoms)
+        self.broken = set()
+        self.verify_thread = None
+        self.verify_again = False
+        self.verify_stop = threading.Event()
 
     def load_skips_and_flags(self):
         """Load skip lists and run flags from files."""
@@ -62,112 +198,297 @@ class RomManager:
             pass
 
     def load_roms(self, callback_progress=None):
-        """Load ROMs from XML and optional file system check."""
+        """Load ROMs from the compiled cache or XML, and optional file system check."""
         import time
-        t_start = time.time()
-        t_start = time.time()
-        
-        xml_path = os.path.join(self.platform_path, "MAMEly.xml")
         
         xml_path = os.path.join(self.platform_path, "MAMEly.xml")
         xml_roms = {}
         
-        if os.path.exists(xml_path):
-            try:
-                print(f"[{time.time()}] Parsing XML: {xml_path}")
-                tree = ET.parse(xml_path)
-                root = tree.getroot()
-                children = list(root)
-                total_nodes = len(children)
+        records = self.cache.load()
+        if records is not None:
+            print(f"[{time.time()}] Loaded {len(records)} ROMs from catalog cache")
+            for name, description, genre, rating, favorite, ignore in records:
+                xml_roms[name] = Rom(name, description, genre, rating, favorite, ignore)
+                if genre != "General":
+                    self.genres.add(genre)
+                if rating != "General":
+                    self.ratings.add(rating)
+            if callback_progress:
+                callback_progress(100)
                 
-                print(f"[{time.time()}] Processing {total_nodes} XML nodes...")
+        elif os.path.exists(xml_path):
+            try:
+                print(f"[{time.time()}] Streaming XML: {xml_path}")
                 
-                for i, child in enumerate(children):
-                    if child.tag == "game":
-                        name = child.attrib.get('name')
-                        description = ""
-                        genre = "General"
-                        rating = "General"
-                        favorite = 0
-                        ignore = 0
+                for name, fields in iter_games(xml_path, callback_progress):
+                    rom = self.rom_from_game(name, fields)
+                    if rom is None:
+                        continue
                         
-                        for grandchild in child:
-                            if grandchild.tag == "description":
-                                description = grandchild.text.title() if grandchild.text else ""
-                            elif grandchild.tag == "genre":
-                                genre = grandchild.text.title() if grandchild.text else "General"
-                                if "/" in genre:
-                                    genre = genre.split("/")[0].strip()
-                            elif grandchild.tag == "rating":
-                                rating = grandchild.text if grandchild.text else "General"
-                            elif grandchild.tag == "favorite":
-                                try:
-                                    favorite = int(grandchild.text)
-                                except:
-                                    favorite = 0
-                            elif grandchild.tag == "ignore":
-                                try:
-                                    ignore = int(grandchild.text)
-                                except:
-                                    ignore = 0
-                                    
-                        # Filtering Logic
-                        if genre in self.skip_genres:
-                            continue
-                        if "Ttl -" in genre: # Hardcoded skip from original
-                            continue
-                        if rating in self.skip_ratings:
-                            continue
-                            
-                        # Store ROM
-                        rom_obj = Rom(name, description, genre, rating, favorite, ignore)
-                        xml_roms[name] = rom_obj
+                    # Store ROM
+                    xml_roms[name] = rom
+                    
+                    if rom.genre != "General":
+                        self.genres.add(rom.genre)
+                    if rom.rating != "General":
+                        self.ratings.add(rom.rating)
                         
-                        if genre != "General":
-                            self.genres.add(genre)
-                        if rating != "General":
-                            self.ratings.add(rating)
-                            
-                    if callback_progress:
-                         callback_progress((i + 1) / total_nodes * 100)
+                print(f"[{time.time()}] Loaded {len(xml_roms)} ROMs from XML")
+                         
+                # Compile for the next load
+                self.cache.save([rom.record() for rom in xml_roms.values()])
             except ET.ParseError as e:
                 print(f"XML Parse Error: {e}")
+                print(f"Ignoring {xml_path} and leaving it untouched until it is fixed")
+                xml_roms = {}
+                self.genres = set()
+                self.ratings = set()
+                self.xml_writable = False
+        
+        # Replay favorite/ignore changes made since the XML was written
+        for field, name, value in self.journal.replay():
+            rom = xml_roms.get(name)
+            if rom is not None:
+                setattr(rom, field, value)
+        self.catalog = xml_roms
         
         # Directory Comparison Logic
         if self.config.compare_xml_to_roms:
-            self.roms = {}
-            if os.path.exists(self.config.rom_directory):
-                
-                count = 0
-                with os.scandir(self.config.rom_directory) as it:
-                    for entry in it:
-                        # entry.is_file() uses cached stat info from the directory listing if available
-                        if entry.is_file():
-                            f = entry.name
-                            
-                            # Strip extension
-                            base_name = f
-                            if self.config.rom_extension in f:
-                                base_name = f.replace(self.config.rom_extension, "")
-                            
-                            # Find in XML dict
-                            if base_name in xml_roms:
-                                 self.roms[base_name] = xml_roms[base_name]
-                            elif f in xml_roms: # Try with extension if needed
-                                 self.roms[f] = xml_roms[f]
-                                 
-                            count += 1
-                                
+            present = self.scan_rom_directory()
+            self.roms = {name: rom for name, rom in xml_roms.items() if name in present}
         else:
             self.roms = xml_roms
 
         # Load Complete
+        self.build_views()
+        self.start_watching()
+        self.start_verifying()
+        
+        if self.xml_writable and self.journal.entries >= JOURNAL_COMPACT_ENTRIES:
+            self.writer.request()
+
+    def rom_from_game(self, name, fields):
+        """Build a Rom from a streamed <game> record, or None if it is filtered out."""
+        description = fields.get("description")
+        description = description.title() if description else ""
+        genre = fields.get("genre")
+        if not genre:
+            # Catalogs built without a genre fall back to catver.ini when the platform has one
+            category = self.get_category(name)
+            genre = category[0] if category else None
+        genre = genre.title() if genre else "General"
+        if "/" in genre:
+            genre = genre.split("/")[0].strip()
+        rating = fields.get("rating") or "General"
+        
+        # Filtering Logic
+        if genre in self.skip_genres:
+            return None
+        if "Ttl -" in genre: # Hardcoded skip from original
+            return None
+        if rating in self.skip_ratings:
+            return None
+            
+        try:
+            favorite = int(fields.get("favorite", 0))
+        except:
+            favorite = 0
+        try:
+            ignore = int(fields.get("ignore", 0))
+        except:
+            ignore = 0
+            
+        return Rom(name, description, genre, rating, favorite, ignore)
+
+    def get_category(self, rom_name):
+        """Return catver's (genre, subgenre, mature) for a ROM, or None."""
+        if self.catver is None:
+            catver_path = os.path.join(self.platform_path, "catver.ini")
+            if not os.path.exists(catver_path):
+                return None
+            self.catver = CatverIndex(catver_path)
+        return self.catver.get(rom_name)
+
+    def scan_rom_directory(self):
+        """Return the set of catalog names that may match files in the ROM directory.
+
+        Each file contributes its name with the ROM extension stripped and, for
+        catalogs that keep the extension in the name, the full file name. The
+        listing itself comes from the directory cache when the directory is unchanged.
+        """
+        files = DirectoryListingCache(self.platform_path, self.config.rom_directory).list_files()
+        self.rom_files = files
+        present = set(files)
+        ext = self.config.rom_extension
+        if ext:
+            present.update(f.replace(ext, "") for f in files if ext in f)
+        return present
+
+    def start_watching(self):
+        """Follow ROM files being added/removed while running (compareXMLtoRoms + watchRomDirectory)."""
+        if not (self.config.compare_xml_to_roms and self.config.watch_rom_directory):
+            return
+        if not os.path.isdir(self.config.rom_directory):
+            return
+        self.watcher = RomDirectoryWatcher(self.config.rom_directory, self.rom_files,
+                                           self.apply_rom_changes, mode=self.config.watch_rom_directory)
+        self.watcher.start()
+
+    def apply_rom_changes(self, added, removed, files):
+        """Add/remove catalog entries for changed ROM files. Called on the watcher thread.
+
+        Each changed ROM is inserted into or removed from its views, so a batch costs
+        a few list operations per file rather than a rebuild of every view.
+        """
+        ext = self.config.rom_extension
+        with self.lock:
+            changed = False
+            for f in added | removed:
+                names = {f}
+                if ext and ext in f:
+                    names.add(f.replace(ext, ""))
+                for name in names:
+                    present = name in files or (ext and name + ext in files)
+                    changed = self._set_present(name, present) or changed
+            
+            if changed:
+                self.roms_changed = True
+        
+        if added:
+            self.start_verifying()
+        
+        # Keep the listing cache current so the next load does not rescan
+        listing = DirectoryListingCache(self.platform_path, self.config.rom_directory)
+        try:
+            listing.save(os.stat(self.config.rom_directory).st_mtime_ns, sorted(files))
+        except OSError:
+            pass
+
+    def start_verifying(self):
+        """Check the ROM sets in the background (verifyRoms), or queue another pass if one is running."""
+        if not self.config.verify_roms:
+            return
+        with self.lock:
+            if self.verify_thread is not None and self.verify_thread.is_alive():
+                self.verify_again = True
+                return
+            self.verify_again = False
+            self.verify_thread = threading.Thread(target=self._run_verify, name="SetVerifier", daemon=True)
+            self.verify_thread.start()
+
+    def _run_verify(self):
+        verifier = SetVerifier(self.platform_path, self.config.rom_directory, self.config.rom_extension)
+        if not verifier.available():
+            return
+        while not self.verify_stop.is_set():
+            files = self.rom_files or DirectoryListingCache(self.platform_path, self.config.rom_directory).list_files()
+            try:
+                broken = verifier.verify(files, stop=self.verify_stop)
+            except Exception as e:
+                print(f"ROM verification failed: {e}")
+                return
+            if not self.verify_stop.is_set():
+                self.apply_verification(broken)
+            with self.lock:
+                if not self.verify_again:
+                    return
+                self.verify_again = False
+
+    def apply_verification(self, broken):
+        """Move sets that failed verification out of the normal views."""
+        with self.lock:
+            if broken == self.broken:
+                return
+            self.broken = broken
+            self.build_views()
+            self.roms_changed = True
+
+    def _set_present(self, name, present):
+        """Show or hide a catalog ROM, updating its views. Returns True if anything changed."""
+        rom = self.catalog.get(name)
+        if rom is None or name not in self.sort_rank:
+            return False
+        if present and name not in self.roms:
+            self.roms[name] = rom
+            self._index(rom)
+            return True
+        if not present and name in self.roms:
+            self._unindex(rom)
+            del self.roms[name]
+            return True
+        return False
+
+    def consume_changes(self):
+        """Return True once after the watcher changed which ROMs are present."""
+        with self.lock:
+            changed = self.roms_changed
+            self.roms_changed = False
+        return changed
+
+    def build_views(self):
+        """Sort the catalog once and build the index list behind every genre view."""
+        self.sorted_roms = sorted(self.catalog.values(), key=operator.attrgetter('description'))
+        self.sort_rank = {rom.name: i for i, rom in enumerate(self.sorted_roms)}
+        self.views = {"All Games": [], "Favorites": [], "Ignore": []}
+        
+        roms = self.roms
+        for i, rom in enumerate(self.sorted_roms):
+            if rom.name in roms:
+                for view in self._views_for(rom):
+                    self.views.setdefault(view, []).append(i)
+        
+        self.search_keys = [search_key(rom.description) for rom in self.sorted_roms]
+        self.last_search = None
+        self.entry_ranks = None
+
+    def _views_for(self, rom):
+        """Names of the views a ROM currently belongs to."""
+        if rom.name in self.broken:
+            # Broken sets only show under "Not Working" (or "Ignore"), and nowhere with verifyRoms = Hide
+            if self.config.verify_roms == "genre":
+                yield "Ignore" if rom.ignore == 1 else NOT_WORKING
+            return
+        if rom.favorite == 1:
+            yield "Favorites"
+        if rom.ignore == 1:
+            yield "Ignore"
+        else:
+            yield "All Games"
+            yield rom.genre
+
+    def _unindex(self, rom):
+        self.last_search = None
+        rank = self.sort_rank[rom.name]
+        for view in self._views_for(rom):
+            positions = self.views[view]
+            i = bisect.bisect_left(positions, rank)
+            if i < len(positions) and positions[i] == rank:
+                del positions[i]
+
+    def _index(self, rom):
+        self.last_search = None
+        rank = self.sort_rank[rom.name]
+        for view in self._views_for(rom):
+            bisect.insort(self.views.setdefault(view, []), rank)
+
+    def catalog_records(self):
+        """(name, description, genre, rating, favorite, ignore) for every ROM save_xml writes."""
+        return [rom.record() for rom in self.catalog.values()]
 
     def save_xml(self):
-        """Dump current ROM list to XML."""
+        """Dump the full catalog to XML and fold the journal into it. Returns True on success."""
+        if not self.xml_writable:
+            print("MAMEly.xml could not be read, not rewriting it")
+            return False
+        
         xml_path = os.path.join(self.platform_path, "MAMEly.xml")
         tmp_path = xml_path + ".tmp"
         
+        # Snapshot under the lock so toggles made while writing stay in the journal
+        with self.lock:
+            records = self.catalog_records()
+            mark = self.journal.mark()
+        
         try:
             with open(tmp_path, "w") as f, \
                  open(os.path.join(self.platform_path, "favorites.txt"), "w") as f_fav, \
@@ -182,20 +503,16 @@ class RomManager:
                 f.write("  </header>\n")
                 
                 count = 0
-                for rom in self.roms.values():
-                    if rom.name:
-                        f.write(f"  <game name=\"{rom.name}\">\n")
-                        f.write(f"     <description>{rom.description}</description>\n")
-                        f.write(f"     <genre>{rom.genre}</genre>\n")
-                        f.write(f"     <rating>{rom.rating}</rating>\n")
-                        f.write(f"     <favorite>{rom.favorite}</favorite>\n")
-                        f.write(f"     <ignore>{rom.ignore}</ignore>\n")
-                        f.write("  </game>\n")
+                for name, description, genre, rating, favorite, ignore in records:
+                    if name:
+                        f.write(format_game(name, [("description", description), ("genre", genre),
+                                                   ("rating", rating), ("favorite", favorite),
+                                                   ("ignore", ignore)]))
                         
-                        if rom.favorite == 1:
-                            f_fav.write(f"{rom.name}\n")
-                        if rom.ignore == 1:
-                            f_ign.write(f"{rom.name}\n")
+                        if favorite == 1:
+                            f_fav.write(f"{name}\n")
+                        if ignore == 1:
+                            f_ign.write(f"{name}\n")
                         count += 1
                 
                 f.write("</menu>\n")
@@ -205,8 +522,16 @@ class RomManager:
                 os.rename(xml_path, xml_path + ".old")
             os.rename(tmp_path, xml_path)
             
+            # Keep the compiled catalog in step with what was just written
+            self.cache.save(records)
+            
         except Exception as e:
             print(f"Error saving XML: {e}")
+            return False
+            
+        with self.lock:
+            self.journal.trim(mark)
+        return True
 
     def get_genre_list(self):
         """Return sorted list of genres including special categories."""
@@ -219,44 +544,125 @@ class RomManager:
         
         # Let's just return what they had for now, but formatted nicely
         full_list = ["All Games", "Favorites"] + genre_list + ["Ignore"]
+        if self.config.verify_roms == "genre" and self.count_roms_by_genre(NOT_WORKING):
+            full_list.insert(-1, NOT_WORKING)
         return full_list
 
     def get_roms_by_genre(self, genre_name):
-        """Return filtered list of ROMs for a given genre category."""
-        results = []
-        
-        # Sort by description
-        sorted_roms = sorted(self.roms.values(), key=operator.attrgetter('description'))
-        
-        for rom in sorted_roms:
-            if genre_name == "All Games":
-                if rom.ignore == 0:
-                    results.append(rom)
-            elif genre_name == "Favorites":
-                if rom.favorite == 1:
-                    results.append(rom)
-            elif genre_name == "Ignore":
-                if rom.ignore == 1:
-                    results.append(rom)
+        """Return ROMs for a given genre category, sorted by description."""
+        with self.lock:
+            sorted_roms = self.sorted_roms
+            return [sorted_roms[i] for i in self.views.get(genre_name, [])]
+
+    def count_roms_by_genre(self, genre_name):
+        with self.lock:
+            return len(self.views.get(genre_name, []))
+
+    def search_roms(self, genre_name, query):
+        """Return the ROMs of a view whose description contains query (case-insensitive), sorted by description."""
+        q = search_key(query)
+        with self.lock:
+            view = self.views.get(genre_name, [])
+            last = self.last_search
+            keys = self.search_keys
+            if last is not None and last[0] == genre_name and last[1] and q.startswith(last[1]):
+                # Typing another character can only narrow the previous result
+                candidates = last[2]
             else:
-                if rom.genre == genre_name and rom.ignore == 0:
-                    results.append(rom)
-                    
-        return results
+                candidates = view
+            # Keys are folded once per view build, so this is a plain C-level substring test per entry
+            positions = [i for i in candidates if q in keys[i]] if q else list(view)
+            self.last_search = (genre_name, q, positions)
+            sorted_roms = self.sorted_roms
+            return [sorted_roms[i] for i in positions]
+
+    def search_entries(self):
+        """(name, description) of every catalog ROM, as indexed for fuzzy search."""
+        with self.lock:
+            return [(rom.name, rom.description) for rom in self.catalog.values()]
+
+    def prepare_search(self):
+        """Start loading (or building) the fuzzy search index unless it is ready or on its way."""
+        with self.lock:
+            if self.search_index is not None or self.search_index_thread is not None:
+                return
+            self.search_index_thread = threading.Thread(target=self._load_search_index,
+                                                        name="SearchIndex", daemon=True)
+            self.search_index_thread.start()
+
+    def _load_search_index(self):
+        index = TrigramIndex(self.platform_path)
+        try:
+            index.load_or_build(self.search_entries())
+        except Exception as e:
+            print(f"Error building search index: {e}")
+            with self.lock:
+                # Let the next prepare_search try again
+                self.search_index_thread = None
+            return
+        with self.lock:
+            self.search_index = index
+
+    def fuzzy_search_roms(self, genre_name, query, limit=FUZZY_LIMIT):
+        """Return the ROMs of a view that best match query by description or short name, best first.
+
+        Returns [] until the index is loaded (see prepare_search).
+        """
+        with self.lock:
+            index = self.search_index
+            if index is None:
+                self.prepare_search()
+                return []
+            if self.entry_ranks is None:
+                sort_rank = self.sort_rank
+                self.entry_ranks = array("i", (sort_rank.get(name, -1) for name in index.names))
+            ranks = self.entry_ranks
+            in_view = set(self.views.get(genre_name, []))
+            results = index.query(query, limit, lambda i: ranks[i] in in_view)
+            sorted_roms = self.sorted_roms
+            return [sorted_roms[ranks[i]] for score, i in results]
 
     def toggle_favorite(self, rom_name):
-        if rom_name in self.roms:
-            self.roms[rom_name].favorite = 1 - self.roms[rom_name].favorite
-            self.save_xml()
-            return self.roms[rom_name].favorite == 1
-        return False
+        with self.lock:
+            if rom_name in self.roms:
+                rom = self.roms[rom_name]
+                self._unindex(rom)
+                rom.favorite = 1 - rom.favorite
+                self._index(rom)
+                self.record_change("favorite", rom.name, rom.favorite)
+                return rom.favorite == 1
+            return False
 
     def toggle_ignore(self, rom_name):
-        if rom_name in self.roms:
-            self.roms[rom_name].ignore = 1 - self.roms[rom_name].ignore
-            self.save_xml()
-            return self.roms[rom_name].ignore == 1
-        return False
+        with self.lock:
+            if rom_name in self.roms:
+                rom = self.roms[rom_name]
+                self._unindex(rom)
+                rom.ignore = 1 - rom.ignore
+                self._index(rom)
+                self.record_change("ignore", rom.name, rom.ignore)
+                return rom.ignore == 1
+            return False
+
+    def record_change(self, field, name, value):
+        """Append a favorite/ignore change to the journal, scheduling compaction when it grows large."""
+        self.journal.append(field, name, value)
+        if self.xml_writable and self.journal.entries >= JOURNAL_COMPACT_ENTRIES:
+            self.writer.request()
+
+    def flush(self):
+        """Finish any pending catalog write before the process loses the CPU or exits."""
+        self.writer.flush()
+
+    def close(self):
+        self.verify_stop.set()
+        if self.verify_thread is not None:
+            self.verify_thread.join()
+            self.verify_thread = None
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self.writer.close()
 
     def get_rom_flags(self, rom_name):
         return self.flag_options.get(rom_name, "")
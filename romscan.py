@@ -0,0 +1,82 @@
+import os
+import zlib
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+READ_SIZE = 1024 * 1024
+
+# Copier headers (e.g. SNES .smc/.swc) put 512 bytes in front of the ROM image,
+# which DATs describe without them
+COPIER_HEADER_SIZE = 512
+
+def zip_crcs(path):
+    """Return the CRC32s of the members of a zip, read from its central directory only."""
+    with zipfile.ZipFile(path) as zf:
+        return [info.CRC for info in zf.infolist() if not info.is_dir()]
+
+def file_crcs(path):
+    """Return the CRC32 of a raw ROM file (plus the CRC without a copier header, if it has one)."""
+    headered = os.path.getsize(path) % 1024 == COPIER_HEADER_SIZE
+    with open(path, "rb", buffering=0) as f:
+        crc = zlib.crc32(f.read(COPIER_HEADER_SIZE)) if headered else 0
+        body_crc = 0
+        while True:
+            data = f.read(READ_SIZE)
+            if not data:
+                break
+            crc = zlib.crc32(data, crc)
+            body_crc = zlib.crc32(data, body_crc)
+    return [crc, body_crc] if headered else [crc]
+
+def rom_crcs(path):
+    """CRC32s identifying a ROM file or zipped set; empty if it cannot be read."""
+    try:
+        if path.lower().endswith(".zip"):
+            return zip_crcs(path)
+        return file_crcs(path)
+    except (OSError, zipfile.BadZipFile) as e:
+        print(f"Cannot read {path}: {e}")
+        return []
+
+def scan_crcs(directory, names, jobs=None):
+    """Map each file name in directory to its CRC32s.
+
+    Zips only cost a central directory read; raw files are hashed on a thread pool
+    (zlib releases the GIL while hashing large buffers).
+    """
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) + 4)) as executor:
+        results = executor.map(rom_crcs, (os.path.join(directory, name) for name in names))
+        return dict(zip(names, results))
+
+def read_dat(dat_path):
+    """Read a Logiqx XML DAT (No-Intro, Redump, ...) into {crc: (description, genre)}.
+
+    genre comes from a <genre> or <category> element when the DAT has one, else "".
+    """
+    entries = {}
+    try:
+        for event, elem in ET.iterparse(dat_path, events=("end",)):
+            if elem.tag not in ("game", "machine"):
+                continue
+            description = elem.findtext("description") or elem.attrib.get("name", "")
+            genre = elem.findtext("genre") or elem.findtext("category") or ""
+            for rom in elem.iter("rom"):
+                crc = rom.attrib.get("crc")
+                if crc:
+                    try:
+                        entries.setdefault(int(crc, 16), (description.strip(), genre.strip()))
+                    except ValueError:
+                        pass
+            elem.clear()
+    except (OSError, ET.ParseError) as e:
+        print(f"Error reading DAT {dat_path}: {e}")
+    return entries
+
+def match_dat(crcs, dat):
+    """Return the (description, genre) of the first CRC found in the DAT, or None."""
+    for crc in crcs:
+        entry = dat.get(crc)
+        if entry is not None:
+            return entry
+    return None
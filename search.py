@@ -0,0 +1,150 @@
+import os
+import re
+import struct
+import hashlib
+import heapq
+from array import array
+from collections import Counter
+from catalog import read_binary, write_binary, pack_strings, pack_array, BinaryReader
+
+SEARCH_MAGIC = b"MAMELYS1"
+SEARCH_FILE = "MAMEly.search"
+
+NON_WORD = re.compile(r"[\W_]+")
+
+def normalize(text):
+    """Casefold and turn punctuation into spaces, so "3 Count Bout / Fire Suplex" reads as words."""
+    return NON_WORD.sub(" ", text.casefold()).strip()
+
+def trigrams(text):
+    """Set of the padded per-word trigrams of text ("  b", " bo", "bou", "out", "ut ")."""
+    grams = set()
+    for word in normalize(text).split():
+        padded = "  " + word + " "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def entries_digest(entries):
+    """SHA-1 over the (name, description) pairs an index is built from."""
+    h = hashlib.sha1()
+    for name, description in entries:
+        h.update(name.encode("utf-8", "surrogateescape"))
+        h.update(b"\0")
+        h.update(description.encode("utf-8", "surrogateescape"))
+        h.update(b"\n")
+    return h.digest()
+
+class TrigramIndex:
+    """Fuzzy lookup of ROMs by description and short name, ranked by trigram similarity.
+
+    Entries are (name, description) pairs; both are indexed, so "sf2" and "street fightr"
+    each find Street Fighter II. Postings for every trigram sit in one array, and the index
+    is persisted in MAMEly.search next to the catalog cache, keyed on the SHA-1 of the
+    entries. Layout (little endian):
+        magic | sha1 | name count, blob length | NUL separated names |
+        trigram count, blob length | NUL separated trigrams |
+        uint32 postings offsets (trigram count + 1) | uint16 trigram count per entry |
+        uint32 postings
+    """
+    def __init__(self, platform_path):
+        self.index_path = os.path.join(platform_path, SEARCH_FILE)
+        self.names = []
+        self.grams = {}  # trigram -> position in offsets
+        self.offsets = array("I", [0])
+        self.sizes = array("H")
+        self.postings = array("I")
+
+    def __len__(self):
+        return len(self.names)
+
+    def load_or_build(self, entries):
+        """Use the persisted index if it was built from the same entries, else build and save it."""
+        entries = list(entries)
+        digest = entries_digest(entries)
+        if not self.load(digest):
+            self.build(entries)
+            self.save(digest)
+
+    def build(self, entries):
+        postings = {}
+        names = []
+        sizes = array("H")
+        for i, (name, description) in enumerate(entries):
+            names.append(name)
+            grams = trigrams(description) | trigrams(name)
+            sizes.append(min(len(grams), 0xFFFF))
+            for gram in grams:
+                p = postings.get(gram)
+                if p is None:
+                    p = postings[gram] = []
+                p.append(i)
+
+        self.names = names
+        self.sizes = sizes
+        self.grams = {}
+        self.offsets = array("I", [0])
+        self.postings = array("I")
+        for gram in sorted(postings):
+            self.grams[gram] = len(self.offsets) - 1
+            self.postings.extend(postings[gram])
+            self.offsets.append(len(self.postings))
+
+    def query(self, text, limit=50, accept=None):
+        """Return up to limit (score, entry) pairs, best first.
+
+        score is the share of the query's trigrams an entry has, ties going to the
+        entry with fewer trigrams overall (closest match). accept(entry) may
+        restrict results (e.g. to the current view).
+        """
+        grams = trigrams(text)
+        if not grams:
+            return []
+        counts = Counter()
+        offsets = self.offsets
+        for gram in grams:
+            g = self.grams.get(gram)
+            if g is not None:
+                # Counter counts an array slice in C
+                counts.update(self.postings[offsets[g]:offsets[g + 1]])
+
+        n = len(grams)
+        sizes = self.sizes
+        if accept is not None:
+            candidates = [(i, shared) for i, shared in counts.items() if accept(i)]
+        else:
+            candidates = counts.items()
+        # Coverage only depends on the shared count, so rank on that before scoring ties
+        best = heapq.nlargest(limit, candidates, key=lambda c: (c[1], -sizes[c[0]]))
+        return [(shared / n, i) for i, shared in best]
+
+    def load(self, digest):
+        data = read_binary(self.index_path)
+        if data is None:
+            return False
+
+        try:
+            reader = BinaryReader(data)
+            if not reader.match(SEARCH_MAGIC) or not reader.match(digest):
+                return False
+            names = reader.strings("surrogateescape")
+            gram_list = reader.strings()
+            offsets = reader.array("I", len(gram_list) + 1)
+            sizes = reader.array("H", len(names))
+            postings = reader.array("I")
+            if len(postings) != offsets[-1]:
+                return False
+        except (struct.error, UnicodeDecodeError, ValueError):
+            return False
+
+        self.names = names
+        self.grams = dict(zip(gram_list, range(len(gram_list))))
+        self.offsets = offsets
+        self.sizes = sizes
+        self.postings = postings
+        return True
+
+    def save(self, digest):
+        gram_list = sorted(self.grams, key=self.grams.get)
+        write_binary(self.index_path, [SEARCH_MAGIC, digest, pack_strings(self.names, "surrogateescape"),
+                                       pack_strings(gram_list), pack_array(self.offsets),
+                                       pack_array(self.sizes), pack_array(self.postings)], "search index")
@@ -0,0 +1,71 @@
+import os
+from config import PlatformConfig
+from roms import RomManager
+
+CATALOG = """<?xml version="1.0"?>
+<menu>
+  <header>
+    <listname>MAMEly</listname>
+  </header>
+  <game name="sonic3k">
+     <description>Sonic &amp; Knuckles</description>
+     <genre>Platform</genre>
+     <rating>General</rating>
+     <favorite>0</favorite>
+     <ignore>0</ignore>
+  </game>
+  <game name="a&lt;b&quot;c">
+     <description>Quote &quot;Test&quot; &lt;Beta&gt;</description>
+     <genre>Maze</genre>
+     <rating>General</rating>
+     <favorite>0</favorite>
+     <ignore>0</ignore>
+  </game>
+</menu>
+"""
+
+def load_manager(platform_path):
+    manager = RomManager(platform_path, PlatformConfig(platform_path, "config.txt"))
+    manager.load_roms()
+    return manager
+
+def test_save_xml_round_trip_escapes(tmp_path):
+    platform_path = str(tmp_path)
+    with open(os.path.join(platform_path, "MAMEly.xml"), "w") as f:
+        f.write(CATALOG)
+
+    manager = load_manager(platform_path)
+    manager.toggle_favorite("sonic3k")
+    assert manager.save_xml()
+    manager.close()
+
+    # Drop the compiled cache so the reload has to parse the rewritten XML
+    os.remove(os.path.join(platform_path, "MAMEly.cache"))
+    reloaded = load_manager(platform_path)
+    reloaded.close()
+
+    assert sorted(reloaded.catalog) == ['a<b"c', "sonic3k"]
+    assert reloaded.catalog["sonic3k"].description == "Sonic & Knuckles"
+    assert reloaded.catalog["sonic3k"].favorite == 1
+    assert reloaded.catalog['a<b"c'].description == 'Quote "Test" <Beta>'
+
+def test_parse_error_leaves_catalog_untouched(tmp_path):
+    platform_path = str(tmp_path)
+    xml_path = os.path.join(platform_path, "MAMEly.xml")
+    games = []
+    for i in range(100):
+        # Game 50 has a bare & the parser rejects, after 50 good records were streamed
+        description = "Bad & Broken" if i == 50 else f"Game {i}"
+        games.append(f"  <game name=\"game{i}\">\n     <description>{description}</description>\n  </game>\n")
+    with open(xml_path, "w") as f:
+        f.write("<?xml version=\"1.0\"?>\n<menu>\n" + "".join(games) + "</menu>\n")
+    with open(xml_path, "rb") as f:
+        before = f.read()
+
+    manager = load_manager(platform_path)
+    assert manager.catalog == {}
+    assert not manager.save_xml()
+    manager.close()
+
+    with open(xml_path, "rb") as f:
+        assert f.read() == before
@@ -1,6 +1,17 @@
 try:
     import config
+    import catalog
+    import catver
+    import listxml
+    import romscan
+    import verify
+    import search
+    import generate
+    import journal
+    import writer
+    import watcher
     import roms
+    import romdb
     import input
     import ui
     import main
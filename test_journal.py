@@ -0,0 +1,74 @@
+import os
+import threading
+from journal import StateJournal, JOURNAL_FILE
+from writer import CatalogWriter
+
+def test_trim_keeps_entries_appended_after_mark(tmp_path):
+    journal = StateJournal(str(tmp_path))
+    journal.append("favorite", "galaga", 1)
+    journal.append("ignore", "pacman", 1)
+    mark = journal.mark()
+    # Toggles made while the XML was being written
+    journal.append("favorite", "galaga", 0)
+    journal.append("favorite", "dkong", 1)
+
+    journal.trim(mark)
+    assert journal.entries == 2
+    assert StateJournal(str(tmp_path)).replay() == [("favorite", "galaga", 0), ("favorite", "dkong", 1)]
+
+def test_trim_everything_removes_the_file(tmp_path):
+    journal = StateJournal(str(tmp_path))
+    journal.append("favorite", "galaga", 1)
+    journal.trim(journal.mark())
+    assert journal.entries == 0
+    assert not os.path.exists(os.path.join(str(tmp_path), JOURNAL_FILE))
+    assert journal.replay() == []
+
+def test_replay_drops_torn_final_line(tmp_path):
+    with open(os.path.join(str(tmp_path), JOURNAL_FILE), "w") as f:
+        f.write("favorite\tgalaga\t1\nignore\tpacman\t1\nfavorite\tdko")
+
+    journal = StateJournal(str(tmp_path))
+    assert journal.replay() == [("favorite", "galaga", 1), ("ignore", "pacman", 1)]
+
+    # The next entry starts on a line of its own instead of joining the torn one
+    journal.append("favorite", "dkong", 1)
+    assert StateJournal(str(tmp_path)).replay() == [("favorite", "galaga", 1), ("ignore", "pacman", 1),
+                                                    ("favorite", "dkong", 1)]
+
+def test_flush_writes_pending_request_immediately():
+    calls = []
+    writer = CatalogWriter(lambda: calls.append(threading.current_thread()), quiet_period=60)
+    writer.request()
+    writer.request()
+    writer.flush()
+    # One write for both requests, done on the calling thread without waiting out the debounce
+    assert calls == [threading.current_thread()]
+    writer.close()
+    assert len(calls) == 1
+
+def test_flush_waits_for_write_in_progress():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    def write():
+        calls.append(threading.current_thread())
+        if len(calls) == 1:
+            started.set()
+            release.wait()
+    writer = CatalogWriter(write, quiet_period=0)
+    writer.request()
+    assert started.wait(5)
+    # A change arrives while the background write runs
+    writer.request()
+
+    flusher = threading.Thread(target=writer.flush)
+    flusher.start()
+    flusher.join(0.2)
+    assert flusher.is_alive()  # still waiting for the background write
+
+    release.set()
+    flusher.join(5)
+    assert not flusher.is_alive()
+    writer.close()
+    assert len(calls) == 2
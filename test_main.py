@@ -0,0 +1,19 @@
+from collections import namedtuple
+from main import build_letter_table
+
+Entry = namedtuple("Entry", "description")
+
+def entries(*descriptions):
+    return [Entry(d) for d in descriptions]
+
+def test_letter_table_symbols_after_letters():
+    roms = entries("1942", "2020", "3 Count", "Asteroids", "~Tilde Game")
+    assert build_letter_table(roms) == [0, 3, 4]
+
+def test_letter_table_symbol_runs_between_letters():
+    roms = entries("[Bracket]", "Alpha", "Apple", "Beta", "_Underscore", "Zaxxon", "Égalité", "~End")
+    assert build_letter_table(roms) == [0, 1, 3, 4, 5, 6, 7]
+
+def test_letter_table_unsorted_fuzzy_results():
+    roms = entries("Pac-Man", "Galaga", "Pac-Land", "Ms. Pac-Man")
+    assert build_letter_table(roms) == [0, 1, 2, 3]
@@ -0,0 +1,85 @@
+import os
+from config import PlatformConfig
+from roms import RomManager
+from romdb import SqliteRomManager
+
+CATALOG = """<?xml version="1.0"?>
+<menu>
+  <game name="galaga">
+     <description>Galaga</description>
+     <genre>Shooter</genre>
+     <favorite>0</favorite>
+     <ignore>0</ignore>
+  </game>
+  <game name="pacman">
+     <description>Pac-Man</description>
+     <genre>Maze</genre>
+     <favorite>0</favorite>
+     <ignore>0</ignore>
+  </game>
+</menu>
+"""
+
+def write_catalog(platform_path):
+    with open(os.path.join(platform_path, "MAMEly.xml"), "w") as f:
+        f.write(CATALOG)
+
+def load(manager_class, platform_path):
+    manager = manager_class(platform_path, PlatformConfig(platform_path, "config.txt"))
+    manager.load_roms()
+    return manager
+
+def favorites(manager):
+    return [rom.name for rom in manager.get_roms_by_genre("Favorites")]
+
+def test_xml_toggle_reaches_sqlite(tmp_path):
+    platform_path = str(tmp_path)
+    write_catalog(platform_path)
+    manager = load(SqliteRomManager, platform_path)
+    manager.close()
+
+    # Journaled by the XML backend, not yet folded into MAMEly.xml
+    manager = load(RomManager, platform_path)
+    manager.toggle_favorite("galaga")
+    manager.close()
+
+    manager = load(SqliteRomManager, platform_path)
+    assert favorites(manager) == ["galaga"]
+    manager.close()
+
+def test_sqlite_toggle_reaches_xml(tmp_path):
+    platform_path = str(tmp_path)
+    write_catalog(platform_path)
+    manager = load(SqliteRomManager, platform_path)
+    manager.toggle_favorite("pacman")
+    manager.close()
+
+    manager = load(RomManager, platform_path)
+    assert favorites(manager) == ["pacman"]
+    manager.close()
+
+    # Once exported, MAMEly.xml carries the state and the journal is folded away
+    manager = load(SqliteRomManager, platform_path)
+    assert manager.save_xml()
+    assert manager.journal.entries == 0
+    manager.close()
+    with open(os.path.join(platform_path, "favorites.txt")) as f:
+        assert f.read() == "pacman\n"
+
+def test_import_prefers_xml_over_old_database(tmp_path):
+    platform_path = str(tmp_path)
+    write_catalog(platform_path)
+    manager = load(SqliteRomManager, platform_path)
+    manager.toggle_favorite("galaga")
+    assert manager.save_xml()
+    manager.close()
+
+    # Unfavorited with the XML backend and compacted, so only MAMEly.xml knows
+    manager = load(RomManager, platform_path)
+    manager.toggle_favorite("galaga")
+    assert manager.save_xml()
+    manager.close()
+
+    manager = load(SqliteRomManager, platform_path)
+    assert favorites(manager) == []
+    manager.close()
@@ -0,0 +1,105 @@
+import os
+import sys
+import random
+import threading
+from config import PlatformConfig
+import roms
+from roms import StringTable, RomManager
+
+def test_string_table_threads_agree():
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for attempt in range(50):
+            table = StringTable()
+            values = [f"Genre {i}" for i in range(200)]
+            results = {}
+
+            def intern(worker):
+                # Each thread walks the same strings in its own order
+                order = values[worker:] + values[:worker]
+                results[worker] = {value: table.code(value) for value in order}
+
+            threads = [threading.Thread(target=intern, args=(w,)) for w in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            assert len(table.strings) == len(values)
+            for codes in results.values():
+                for value, code in codes.items():
+                    assert table.strings[code] == value
+    finally:
+        sys.setswitchinterval(old_interval)
+
+def make_platform(tmp_path, present):
+    platform_path = str(tmp_path)
+    rom_directory = os.path.join(platform_path, "roms")
+    os.mkdir(rom_directory)
+    genres = ["Shooter", "Maze", "Puzzle"]
+    games = []
+    for i in range(30):
+        favorite = 1 if i % 7 == 0 else 0
+        ignore = 1 if i % 11 == 0 else 0
+        games.append(f"  <game name=\"game{i}\">\n     <description>Title {(i * 17) % 30}</description>\n"
+                     f"     <genre>{genres[i % 3]}</genre>\n     <favorite>{favorite}</favorite>\n"
+                     f"     <ignore>{ignore}</ignore>\n  </game>\n")
+    with open(os.path.join(platform_path, "MAMEly.xml"), "w") as f:
+        f.write("<?xml version=\"1.0\"?>\n<menu>\n" + "".join(games) + "</menu>\n")
+    with open(os.path.join(platform_path, "config.txt"), "w") as f:
+        f.write(f"romDirectory = {rom_directory}\ncompareXMLtoRoms = True\n")
+    for name in present:
+        open(os.path.join(rom_directory, name + ".zip"), "w").close()
+    manager = RomManager(platform_path, PlatformConfig(platform_path, "config.txt"))
+    manager.load_roms()
+    return manager
+
+def view_names(manager):
+    views = {}
+    for view in manager.get_genre_list():
+        views[view] = [rom.name for rom in manager.get_roms_by_genre(view)]
+    return views
+
+def test_rom_changes_update_views_in_place(tmp_path):
+    present = set(f"game{i}" for i in range(0, 30, 2))
+    manager = make_platform(tmp_path, present)
+    rng = random.Random(4)
+    for step in range(40):
+        name = f"game{rng.randrange(30)}"
+        if name in present:
+            present.discard(name)
+            added, removed = set(), {name + ".zip"}
+        else:
+            present.add(name)
+            added, removed = {name + ".zip"}, set()
+        files = set(n + ".zip" for n in present)
+        manager.apply_rom_changes(added, removed, files)
+        incremental = view_names(manager)
+
+        # Same views as a full rebuild over the ROMs now present
+        manager.build_views()
+        assert incremental == view_names(manager)
+        assert set(manager.roms) == present
+    manager.close()
+
+def test_search_index_retries_after_failure(tmp_path, monkeypatch):
+    manager = make_platform(tmp_path, [f"game{i}" for i in range(30)])
+    real_load_or_build = roms.TrigramIndex.load_or_build
+    started = threading.Event()
+    def fail(self, entries):
+        started.wait()
+        raise OSError("disk full")
+    monkeypatch.setattr(roms.TrigramIndex, "load_or_build", fail)
+    manager.prepare_search()
+    thread = manager.search_index_thread
+    started.set()
+    thread.join()
+    assert manager.search_index is None
+    assert manager.search_index_thread is None
+
+    monkeypatch.setattr(roms.TrigramIndex, "load_or_build", real_load_or_build)
+    manager.prepare_search()
+    manager.search_index_thread.join()
+    assert manager.fuzzy_search_roms("All Games", "Title 12")
+    manager.close()
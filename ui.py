@@ -1,9 +1,25 @@
 import pygame
 import os
+from collections import OrderedDict
 from version import __version__
 
+try:
+    # Optional: only used to build textStrokeWidth outlines with a true max filter
+    import numpy
+except ImportError:
+    numpy = None
+
+# Offsets of the classic shadow (drawn at four diagonals around the text)
+SHADOW_OFFSET = 2
+
+# Rendered text surfaces kept by UIManager.render_text (a screen shows ~30 strings)
+TEXT_CACHE_SIZE = 512
+
+# Scaled snaps kept by UIManager.draw_image
+IMAGE_CACHE_SIZE = 50
+
 class UIManager:
-    def __init__(self, config, skin_config):
+    def __init__(self, config, skin_config, background=None):
         self.config = config
         self.skin = skin_config
         self.screen_width = config.screen_width
@@ -19,26 +35,48 @@ class UIManager:
         # Font Cache
         self.fonts = {}
         
-        # Image Cache (Path -> Surface)
-        self.image_cache = {}
+        # Rendered Text Cache ((text, font, color, shadow color, stroke) -> (surface, padding)), least recently used first
+        self.text_cache = OrderedDict()
+        self.text_cache_hits = 0
+        self.text_cache_misses = 0
+        
+        # Scaled Image Cache ((path, box) -> (surface, position)), least recently used first
+        self.image_cache = OrderedDict()
+        
+        # Dirty rects: what this frame drew (erased again by the next begin_frame)
+        # and what end_frame must push to the display
+        self.drawn_rects = []
+        self.update_rects = []
+        self.full_redraw = True
         
         # Load Background
         self.background = None
-        self.load_background()
+        self.load_background(background)
 
-    def load_background(self):
-        bg_path = self.skin.get("backgroundImage")
+    @staticmethod
+    def read_background(skin):
+        """Load a skin's background image from disk (no display access, so safe off the main thread)."""
+        bg_path = skin.get("backgroundImage")
         if bg_path:
-            full_path = os.path.join(self.skin.platform_path, bg_path)
+            full_path = os.path.join(skin.platform_path, bg_path)
             if os.path.exists(full_path):
                 try:
-                    self.background = pygame.image.load(full_path)
+                    return pygame.image.load(full_path)
                 except:
                     print(f"Failed to load background: {full_path}")
+        return None
+
+    def load_background(self, background=None):
+        if background is None:
+            background = self.read_background(self.skin)
+        if background is not None:
+            # Display format, or every restore of it converts pixels on the fly
+            self.background = background.convert()
         
         if self.background is None:
-            self.background = pygame.Surface((self.screen_width, self.screen_height))
+            self.background = pygame.Surface((self.screen_width, self.screen_height)).convert()
             self.background.fill((0, 0, 0))
+        self.full_redraw = True
 
     def get_font(self, font_name, size):
         key = (font_name, size)
@@ -62,65 +100,119 @@ class UIManager:
             text = text[:truncate_len]
             
         font = self.get_font(font_name, size)
+        text_surf, pad = self.render_text(text, font, color, shadow_color if shadow else None)
         
-        if shadow and shadow_color:
-            shadow_surf = font.render(text, True, shadow_color)
-            shadow_rect = shadow_surf.get_rect()
-            offsets = [(-2, -2), (-2, 2), (2, -2), (2, 2)]
-            for ox, oy in offsets:
-                if centered:
-                    shadow_rect.center = (x + ox, y + oy)
-                else:
-                    shadow_rect.topleft = (x + ox, y + oy)
-                self.screen.blit(shadow_surf, shadow_rect)
-                
-        text_surf = font.render(text, True, color)
+        # Outlined text is padded on every side, so only a topleft placement needs adjusting
         text_rect = text_surf.get_rect()
         if centered:
             text_rect.center = (x, y)
         else:
-            text_rect.topleft = (x, y)
-        self.screen.blit(text_surf, text_rect)
+            text_rect.topleft = (x - pad, y - pad)
+        self.drawn_rects.append(self.screen.blit(text_surf, text_rect))
+
+    def render_text(self, text, font, color, shadow_color=None):
+        """Return (surface, padding) for a string, rendering only on a cache miss.
+
+        With a shadow color the outline and the text are composed into one surface,
+        padded by the outline width, so drawing it is a single blit.
+        """
+        # The stroke width is part of the key, as platforms with other skins share this cache
+        key = (text, font, tuple(color) if color else None,
+               tuple(shadow_color) if shadow_color else None,
+               self.skin.get("textStrokeWidth", 0) if shadow_color else 0)
+        entry = self.text_cache.get(key)
+        if entry is not None:
+            self.text_cache_hits += 1
+            self.text_cache.move_to_end(key)
+            return entry
+        
+        self.text_cache_misses += 1
+        text_surf = font.render(text, True, color)
+        if shadow_color:
+            entry = self.outline_text(text_surf, font.render(text, True, shadow_color), shadow_color)
+        else:
+            entry = (text_surf, 0)
+        self.text_cache[key] = entry
+        if len(self.text_cache) > TEXT_CACHE_SIZE:
+            self.text_cache.popitem(last=False)
+        return entry
+
+    def outline_text(self, text_surf, shadow_surf, shadow_color):
+        """Compose text over its outline. Returns (surface, padding).
+
+        The skin's textStrokeWidth selects a round stroke of that many pixels;
+        without it the outline is the classic shadow at four diagonal offsets.
+        """
+        stroke = self.skin.get("textStrokeWidth", 0)
+        stroke = stroke if isinstance(stroke, int) and stroke > 0 else 0
+        pad = stroke or SHADOW_OFFSET
+        w, h = text_surf.get_size()
+        surf = pygame.Surface((w + 2 * pad, h + 2 * pad), pygame.SRCALPHA)
+        
+        if not stroke:
+            offsets = [(-pad, -pad), (-pad, pad), (pad, -pad), (pad, pad)]
+        else:
+            offsets = [(dx, dy) for dx in range(-pad, pad + 1) for dy in range(-pad, pad + 1)
+                       if dx * dx + dy * dy <= pad * pad]
+        
+        if stroke and numpy is not None:
+            # Dilate the glyph coverage with a max filter, then fill with the stroke color
+            coverage = pygame.surfarray.array_alpha(shadow_surf)
+            alpha = numpy.zeros((w + 2 * pad, h + 2 * pad), dtype=numpy.uint8)
+            for dx, dy in offsets:
+                window = alpha[pad + dx:pad + dx + w, pad + dy:pad + dy + h]
+                numpy.maximum(window, coverage, out=window)
+            surf.fill(tuple(shadow_color) + (255,))
+            pixels = pygame.surfarray.pixels_alpha(surf)
+            pixels[:] = alpha
+            del pixels  # unlocks the surface
+        else:
+            for dx, dy in offsets:
+                surf.blit(shadow_surf, (pad + dx, pad + dy))
+        
+        surf.blit(text_surf, (pad, pad))
+        return (surf, pad)
 
     def draw_image(self, image_path, x1, y1, x2, y2, fallback_path=None):
         """Draw and scale image to fit within box defined by (x1, y1) to (x2, y2)."""
-        # Check cache (scaled result could be cached but dimensions change rarely for same path)
-        # We will cache the ORIGINAL loaded surface to avoid disk I/O.
-        # Scaling is fast enough for one image, but we can cache scaled too if needed.
-        # Given the usage, caching the result of load is critical.
-        
-        img = None
-        if image_path in self.image_cache:
-            img = self.image_cache[image_path]
-        elif fallback_path and fallback_path in self.image_cache:
-            img = self.image_cache[fallback_path]
-            
-        if img is None:
+        box = (x1, y1, x2, y2)
+        key = (image_path, box)
+        entry = self.image_cache.get(key)
+        if entry is None and fallback_path:
+            key = (fallback_path, box)
+            entry = self.image_cache.get(key)
+        
+        if entry is not None:
+            self.image_cache.move_to_end(key)
+        else:
             # Try loading
-            path_to_load = None
             if os.path.exists(image_path):
                 path_to_load = image_path
             elif fallback_path and os.path.exists(fallback_path):
                 path_to_load = fallback_path
-                
-            if path_to_load:
-                try:
-                    img = pygame.image.load(path_to_load)
-                    
-                    # Manage cache size - simple eviction
-                    if len(self.image_cache) > 50:
-                        self.image_cache.pop(next(iter(self.image_cache)))
-                        
-                    self.image_cache[path_to_load] = img
-                    # Also link the requested path if it was the primary one
-                    if path_to_load == image_path:
-                        self.image_cache[image_path] = img
-                        
-                except Exception:
-                    return
             else:
                 return
+            entry = self.load_scaled_image(path_to_load, box)
+            if entry is None:
+                return
+            self.image_cache[(path_to_load, box)] = entry
+            if len(self.image_cache) > IMAGE_CACHE_SIZE:
+                self.image_cache.popitem(last=False)
+        
+        scaled_img, pos = entry
+        self.drawn_rects.append(self.screen.blit(scaled_img, pos))
 
+    def load_scaled_image(self, path, box):
+        """Load an image and fit it into box once. Returns (surface in display format, position) or None."""
+        x1, y1, x2, y2 = box
+        try:
+            img = pygame.image.load(path)
+            # smoothscale needs 24/32 bit pixels, and display format makes the blit a plain copy
+            img = img.convert_alpha() if img.get_alpha() is not None else img.convert()
+        except Exception:
+            print(f"Failed to load image: {path}")
+            return None
+        
         width = x2 - x1
         height = y2 - y1
         x_center = x1 + width // 2
@@ -128,33 +220,42 @@ class UIManager:
         
         # Scale Logic
         img_w, img_h = img.get_size()
-        scale_w = width / float(img_w)
-        scale_h = height / float(img_h)
-        scale = min(scale_w, scale_h) # Fit inside
-        
+        if img_w == 0 or img_h == 0:
+            return None
+        scale = min(width / float(img_w), height / float(img_h)) # Fit inside
         new_w = int(img_w * scale)
         new_h = int(img_h * scale)
+        if new_w <= 0 or new_h <= 0:
+            return None
         
-        # Transform (this creates a new surface, but it's in memory)
-        # For absolute max performance we could cache this too, but disk I/O is the main killer.
-        scaled_img = pygame.transform.scale(img, (new_w, new_h))
-        
-        draw_x = x_center - new_w // 2
-        draw_y = y_center - new_h // 2
-        
-        self.screen.blit(scaled_img, (draw_x, draw_y))
+        scaled_img = pygame.transform.smoothscale(img, (new_w, new_h))
+        return (scaled_img, (x_center - new_w // 2, y_center - new_h // 2))
 
     def draw_progress_bar(self, percent, x1, y1, x2):
         if percent <= 0: return
         full_width = x2 - x1
         bar_width = int(full_width * (percent / 100))
-        pygame.draw.line(self.screen, (255, 0, 0), (x1, y1), (x1 + bar_width, y1), 20)
+        self.drawn_rects.append(pygame.draw.line(self.screen, (255, 0, 0), (x1, y1), (x1 + bar_width, y1), 20))
+
+    def invalidate(self):
+        """Repaint the whole screen next frame (e.g. after another program had the display)."""
+        self.full_redraw = True
 
     def begin_frame(self):
-        self.screen.blit(self.background, (0, 0))
+        """Restore the background under whatever the last frame drew."""
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+            self.update_rects = [self.screen.get_rect()]
+            self.full_redraw = False
+        else:
+            for rect in self.drawn_rects:
+                self.screen.blit(self.background, rect, rect)
+            self.update_rects = self.drawn_rects
+        self.drawn_rects = []
 
     def end_frame(self):
-        pygame.display.flip()
+        # Push the erased and the newly drawn regions only
+        pygame.display.update(self.update_rects + self.drawn_rects)
         self.clock.tick(60)
         
     def show_message(self, message, color=None):
@@ -177,7 +278,7 @@ class UIManager:
         overlay = pygame.Surface((self.screen_width, self.screen_height))
         overlay.set_alpha(200)
         overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.drawn_rects.append(self.screen.blit(overlay, (0, 0)))
         
         # Helper for centering
         cx, cy = self.screen_width // 2, self.screen_height // 2
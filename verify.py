@@ -0,0 +1,157 @@
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from catalog import file_signature
+
+VERIFY_MAGIC = "MAMELYR1"
+VERIFY_FILE = "verify.cache"
+LISTXML_FILE = "mame-listxml.xml"
+
+# Sets handed to a worker process at a time
+VERIFY_CHUNK_SIZE = 64
+
+def read_expected_roms(listxml_path, names, stop=None):
+    """Stream mame -listxml and return {machine: [(crc, size), ...]} for the given machines.
+
+    Only ROMs that must be in the machine's own zip are kept: "merge" ROMs live in
+    the parent or BIOS set and nodump ROMs cannot be checked. Returns None if the
+    stop event is set while reading.
+    """
+    wanted = set(names)
+    expected = {}
+    root = None
+    for event, elem in ET.iterparse(listxml_path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag != "machine":
+            continue
+        if stop is not None and stop.is_set():
+            return None
+        name = elem.attrib.get("name")
+        if name in wanted:
+            roms = []
+            for rom in elem.iter("rom"):
+                attrib = rom.attrib
+                if "merge" in attrib or attrib.get("status") == "nodump" or "crc" not in attrib:
+                    continue
+                try:
+                    roms.append((int(attrib["crc"], 16), int(attrib.get("size", 0))))
+                except ValueError:
+                    pass
+            expected[name] = roms
+        root.clear()
+    return expected
+
+def verify_set(task):
+    """Check one zip's central directory against its expected ROMs. Returns (file name, ok)."""
+    path, expected = task
+    try:
+        with zipfile.ZipFile(path) as zf:
+            present = set((info.CRC, info.file_size) for info in zf.infolist())
+    except (OSError, zipfile.BadZipFile):
+        return os.path.basename(path), False
+    return os.path.basename(path), all(rom in present for rom in expected)
+
+class SetVerifier:
+    """Verifies a platform's ROM zips against mame -listxml, caching results per file.
+
+    A file is only reopened when its (size, mtime) changed since it was last checked,
+    so listxml is only parsed when there is something new to verify. The cache is
+    text: a "magic<TAB>listxml mtime_ns<TAB>listxml size" header line, then one
+    "file<TAB>size<TAB>mtime_ns<TAB>ok" line per file.
+    """
+    def __init__(self, platform_path, rom_directory, rom_extension=".zip"):
+        self.rom_directory = rom_directory
+        self.rom_extension = rom_extension
+        self.listxml_path = os.path.join(platform_path, LISTXML_FILE)
+        self.cache_path = os.path.join(platform_path, VERIFY_FILE)
+
+    def available(self):
+        return os.path.exists(self.listxml_path) and os.path.isdir(self.rom_directory)
+
+    def verify(self, files, jobs=None, stop=None):
+        """Return the set of ROM names (extension stripped) whose sets are incomplete or unreadable.
+
+        Setting the stop event abandons the run; whatever was verified so far is still cached.
+        """
+        header = [VERIFY_MAGIC] + [str(v) for v in file_signature(self.listxml_path)]
+        results = self.load(header)
+
+        ext = self.rom_extension
+        keys = {}
+        for f in files:
+            if not f.endswith(ext):
+                continue
+            try:
+                st = os.stat(os.path.join(self.rom_directory, f))
+            except OSError:
+                continue
+            keys[f] = (st.st_size, st.st_mtime_ns)
+
+        current = {}
+        pending = []
+        for f, key in keys.items():
+            cached = results.get(f)
+            if cached is not None and cached[0] == key:
+                current[f] = cached
+            else:
+                pending.append(f)
+
+        if pending:
+            print(f"Verifying {len(pending)} ROM sets against {self.listxml_path}")
+            try:
+                expected = read_expected_roms(self.listxml_path, (f[:-len(ext)] for f in pending), stop)
+            except (OSError, ET.ParseError) as e:
+                print(f"Error reading {self.listxml_path}: {e}")
+                return set()
+            if expected is None:
+                return set()
+
+            tasks = []
+            for f in pending:
+                roms = expected.get(f[:-len(ext)])
+                if roms is None:
+                    # Sets listxml does not know are left alone
+                    current[f] = (keys[f], True)
+                else:
+                    tasks.append((os.path.join(self.rom_directory, f), roms))
+
+            executor = ProcessPoolExecutor(max_workers=jobs)
+            try:
+                for f, ok in executor.map(verify_set, tasks, chunksize=VERIFY_CHUNK_SIZE):
+                    current[f] = (keys[f], ok)
+                    if stop is not None and stop.is_set():
+                        break
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+                self.save(header, current)
+
+        return set(f[:-len(ext)] for f, (key, ok) in current.items() if not ok)
+
+    def load(self, header):
+        results = {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                if f.readline().rstrip("\n").split("\t") != header:
+                    return results
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) == 4:
+                        results[parts[0]] = ((int(parts[1]), int(parts[2])), parts[3] == "1")
+        except (OSError, UnicodeDecodeError, ValueError):
+            return {}
+        return results
+
+    def save(self, header, results):
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("\t".join(header) + "\n")
+                for name, ((size, mtime), ok) in results.items():
+                    f.write(f"{name}\t{size}\t{mtime}\t{1 if ok else 0}\n")
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Error writing verification cache: {e}")
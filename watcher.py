@@ -0,0 +1,151 @@
+import os
+import sys
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+# Files count as added once fully written or moved in, so half-copied ROMs never show up
+IN_ADDED = IN_CLOSE_WRITE | IN_MOVED_TO
+IN_REMOVED = IN_DELETE | IN_MOVED_FROM
+IN_WATCH_GONE = IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED
+
+EVENT_HEADER = struct.Struct("iIII")
+
+def load_inotify():
+    """Return libc if it provides inotify, else None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+class RomDirectoryWatcher:
+    """Reports files added to or removed from a ROM directory from a background thread.
+
+    Uses inotify where available and falls back to polling the directory mtime
+    (always used with mode "poll", e.g. for network shares inotify cannot see).
+    on_change(added, removed, files) receives sets of file names plus the full
+    current set of file names.
+    """
+    def __init__(self, directory, files, on_change, mode="auto", poll_interval=5.0):
+        self.directory = directory
+        self.files = set(files)
+        self.on_change = on_change
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="RomDirectoryWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        libc = load_inotify() if self.mode != "poll" else None
+        if libc is not None and self._watch_inotify(libc):
+            return
+        self._watch_poll()
+
+    def _report(self, added, removed):
+        added -= self.files
+        removed &= self.files
+        if not added and not removed:
+            return
+        self.files |= added
+        self.files -= removed
+        try:
+            self.on_change(added, removed, set(self.files))
+        except Exception as e:
+            print(f"Error applying ROM directory changes: {e}")
+
+    def _rescan(self):
+        try:
+            with os.scandir(self.directory) as it:
+                current = set(entry.name for entry in it if entry.is_file())
+        except OSError:
+            return
+        self._report(current - self.files, self.files - current)
+
+    def _watch_inotify(self, libc):
+        """Watch with inotify until stopped. Returns False if polling should take over."""
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return False
+        try:
+            wd = libc.inotify_add_watch(fd, os.fsencode(self.directory),
+                                        IN_ADDED | IN_REMOVED | IN_DELETE_SELF | IN_MOVE_SELF)
+            if wd < 0:
+                return False
+            # Catch anything that changed between the catalog scan and the watch starting
+            self._rescan()
+
+            while not self.stop_event.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.5)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+
+                added, removed = set(), set()
+                offset = 0
+                while offset + EVENT_HEADER.size <= len(data):
+                    _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                    raw_name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length]
+                    offset += EVENT_HEADER.size + length
+                    name = os.fsdecode(raw_name.split(b"\0", 1)[0])
+
+                    if mask & IN_Q_OVERFLOW:
+                        self._rescan()
+                    elif mask & IN_WATCH_GONE:
+                        # Directory deleted or moved (e.g. share unmounted): poll until it is back
+                        return False
+                    elif mask & IN_ISDIR or not name:
+                        continue
+                    elif mask & IN_ADDED:
+                        added.add(name)
+                        removed.discard(name)
+                    elif mask & IN_REMOVED:
+                        removed.add(name)
+                        added.discard(name)
+                self._report(added, removed)
+            return True
+        finally:
+            os.close(fd)
+
+    def _watch_poll(self):
+        last_mtime = None
+        while not self.stop_event.is_set():
+            try:
+                mtime = os.stat(self.directory).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime != last_mtime:
+                last_mtime = mtime
+                if mtime is not None:
+                    self._rescan()
+            self.stop_event.wait(self.poll_interval)
@@ -0,0 +1,78 @@
+import threading
+import time
+
+class CatalogWriter:
+    """Runs a catalog write on a background thread once changes have gone quiet.
+
+    request() may be called any number of times; the write happens once, quiet_period
+    seconds after the last request. flush() performs any pending write immediately on
+    the calling thread (used before launching an emulator and on exit).
+    """
+    def __init__(self, write, quiet_period=2.0):
+        self.write = write
+        self.quiet_period = quiet_period
+        self.cond = threading.Condition()
+        self.pending = False
+        self.writing = False
+        self.deadline = 0
+        self.stopped = False
+        self.thread = None
+
+    def request(self):
+        with self.cond:
+            if self.stopped:
+                return
+            self.pending = True
+            self.deadline = time.monotonic() + self.quiet_period
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="CatalogWriter", daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.stopped:
+                    if self.pending and not self.writing:
+                        remaining = self.deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.cond.wait(remaining)
+                    else:
+                        self.cond.wait()
+                if self.stopped:
+                    return
+                self.pending = False
+                self.writing = True
+            self._write()
+
+    def _write(self):
+        try:
+            self.write()
+        except Exception as e:
+            print(f"Catalog write failed: {e}")
+        finally:
+            with self.cond:
+                self.writing = False
+                self.cond.notify_all()
+
+    def flush(self):
+        """Write now if anything is pending, after waiting out any write in progress."""
+        with self.cond:
+            while self.writing:
+                self.cond.wait()
+            if not self.pending:
+                return
+            self.pending = False
+            self.writing = True
+        self._write()
+
+    def close(self):
+        """Flush and stop the background thread."""
+        self.flush()
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None